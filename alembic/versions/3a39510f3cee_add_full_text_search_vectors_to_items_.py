@@ -0,0 +1,34 @@
+"""Add full text search vectors to items and shops
+
+Revision ID: 3a39510f3cee
+Revises: 6d1f63304787
+Create Date: 2026-10-18 17:50:23.138908
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3a39510f3cee'
+down_revision: Union[str, Sequence[str], None] = '6d1f63304787'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple', coalesce(name, '')), 'A') || setweight(to_tsvector('simple', coalesce(category, '')), 'B') || setweight(to_tsvector('simple', coalesce(description, '')), 'C')", persisted=True), nullable=True))
+    op.create_index('idx_items_search', 'items', ['search_vector'], unique=False, postgresql_using='gin')
+    op.add_column('shops', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple', coalesce(name, '')), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'C')", persisted=True), nullable=True))
+    op.create_index('idx_shops_search', 'shops', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_shops_search', table_name='shops', postgresql_using='gin')
+    op.drop_column('shops', 'search_vector')
+    op.drop_index('idx_items_search', table_name='items', postgresql_using='gin')
+    op.drop_column('items', 'search_vector')
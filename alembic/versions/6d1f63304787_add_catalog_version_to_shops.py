@@ -0,0 +1,28 @@
+"""Add catalog version to shops
+
+Revision ID: 6d1f63304787
+Revises: 2699c39ca11a
+Create Date: 2026-10-18 17:49:11.260977
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d1f63304787'
+down_revision: Union[str, Sequence[str], None] = '2699c39ca11a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('shops', sa.Column('catalog_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('shops', 'catalog_version')
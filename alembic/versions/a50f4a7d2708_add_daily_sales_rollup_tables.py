@@ -0,0 +1,57 @@
+"""Add daily sales rollup tables
+
+Revision ID: a50f4a7d2708
+Revises: af02a89349d9
+Create Date: 2026-10-18 17:55:10.965698
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a50f4a7d2708'
+down_revision: Union[str, Sequence[str], None] = 'af02a89349d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shop_daily_sales',
+    sa.Column('shop_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False),
+    sa.Column('cancelled_revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('cancelled_items', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['shop_id'], ['shops.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('shop_id', 'day')
+    )
+    op.create_table('item_daily_sales',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('shop_id', sa.Integer(), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('cancelled_quantity', sa.Integer(), nullable=False),
+    sa.Column('cancelled_revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['shop_id'], ['shops.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('item_id', 'day')
+    )
+    op.create_index('idx_item_daily_sales_shop_day', 'item_daily_sales', ['shop_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_item_daily_sales_shop_day', table_name='item_daily_sales')
+    op.drop_table('item_daily_sales')
+    op.drop_table('shop_daily_sales')
@@ -0,0 +1,30 @@
+"""Add per shop sku to items
+
+Revision ID: af02a89349d9
+Revises: 3a39510f3cee
+Create Date: 2026-10-18 17:52:14.113875
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af02a89349d9'
+down_revision: Union[str, Sequence[str], None] = '3a39510f3cee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('sku', sa.String(length=100), nullable=True))
+    op.create_index('uq_items_shop_sku', 'items', ['shop_id', 'sku'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_items_shop_sku', table_name='items')
+    op.drop_column('items', 'sku')
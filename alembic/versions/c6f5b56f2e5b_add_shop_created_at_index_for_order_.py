@@ -0,0 +1,28 @@
+"""Add shop created_at index for order feed pagination
+
+Revision ID: c6f5b56f2e5b
+Revises: 1d415e894964
+Create Date: 2026-10-18 17:35:43.364711
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f5b56f2e5b'
+down_revision: Union[str, Sequence[str], None] = '1d415e894964'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_shop_created_at', 'orders', ['shop_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_shop_created_at', table_name='orders')
@@ -0,0 +1,28 @@
+"""add user created_at index for order history
+
+Revision ID: d30b7c7a6ef7
+Revises: a50f4a7d2708
+Create Date: 2026-10-18 18:00:35.824627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd30b7c7a6ef7'
+down_revision: Union[str, Sequence[str], None] = 'a50f4a7d2708'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_user_created_at', 'orders', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_user_created_at', table_name='orders')
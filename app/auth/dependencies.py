@@ -1,46 +1,83 @@
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import async_session_maker
 from app.models.user import User
 from app.models.enums import UserType
 from app.core.config import settings
+from app.core.jwt import get_optional_claims
+from app.auth.user_cache import user_cache, CachedUser
 
 oauth2_scheme = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-):
-    cred_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication",
         headers={"WWW-Authenticate": "Bearer"}
     )
 
-    token = credentials.credentials
 
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("user_id")
+# Decoded JWT payload of an authenticated request. The decode itself is
+# get_optional_claims, which the database sessions use as well, so the token
+# is only decoded once however many dependencies need it.
+async def get_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    payload: Optional[dict] = Depends(get_optional_claims)
+) -> dict:
+    if payload is None or payload.get("user_id") is None:
+        raise _credentials_exception()
+
+    return payload
+
+
+# A cache miss looks the user up on a short-lived session of its own rather
+# than the request's, so the connection is back in the pool before the
+# endpoint takes one (read endpoints open a second, read session)
+async def get_current_user(claims: dict = Depends(get_token_claims)) -> CachedUser:
+    user_id: int = claims["user_id"]
+
+    user = await user_cache.get(user_id)
 
-        if user_id is None:
-            raise cred_exception
-    except JWTError:
-        raise cred_exception
+    if user is None:
+        async with async_session_maker() as session:
+            db_user = await session.get(User, user_id)
 
-    user = await db.get(User, user_id)
+        if not db_user:
+            raise _credentials_exception()
 
-    if not user:
-        raise cred_exception
+        user = CachedUser.from_user(db_user)
+        await user_cache.set(user)
 
     return user
 
 
+# Identity taken from the token alone, used for role checks when
+# AUTH_ROLE_FROM_CLAIMS is on. Only carries what the token does.
+@dataclass(frozen=True)
+class TokenUser:
+    id: int
+    user_type: UserType
+
+
+# The current user for role checks. With AUTH_ROLE_FROM_CLAIMS the role in the
+# token is trusted and no lookup happens at all, so a role change or a
+# deactivation only takes effect once the token expires.
+async def get_current_principal(claims: dict = Depends(get_token_claims)):
+    if settings.AUTH_ROLE_FROM_CLAIMS and claims.get("user_type"):
+        try:
+            return TokenUser(id=claims["user_id"], user_type=UserType(claims["user_type"]))
+        except ValueError:
+            raise _credentials_exception()
+
+    return await get_current_user(claims)
+
+
 def require_role(role: UserType):
-    async def role_checker(user: User = Depends(get_current_user)):
+    async def role_checker(user = Depends(get_current_principal)):
         if user.user_type != role:
             raise HTTPException(
                 status_code=403,
@@ -50,13 +87,12 @@ def require_role(role: UserType):
     return role_checker
 
 def require_shop_owner(
-        current_user: User = Depends(get_current_user)
+        current_user = Depends(get_current_principal)
 ):
     if current_user.user_type != UserType.SHOP_OWNER:
         raise HTTPException(
             status_code=403,
             detail="Only shop owner can perform this task"
         )
-    
-    return current_user
 
+    return current_user
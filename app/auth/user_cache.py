@@ -0,0 +1,211 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.enums import UserType
+from app.models.user import User
+
+
+# Detached, read-only copy of the columns handlers need from the current user.
+# Safe to share between requests and sessions, unlike a User instance.
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    user_type: UserType
+    is_active: bool
+    phone: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            user_type=user.user_type,
+            is_active=user.is_active,
+            phone=user.phone,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+
+# Shared second level behind the per-process cache, so several workers can
+# reuse each other's lookups. A Redis/memcached client would implement this.
+class UserCacheBackend(ABC):
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def set(self, user_id: int, data: dict, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, user_id: int) -> None:
+        ...
+
+
+# In-memory stand-in for a shared backend, for tests and single host setups
+class InMemoryUserCacheBackend(UserCacheBackend):
+
+    def __init__(self):
+        self._entries: dict[int, tuple[float, dict]] = {}
+
+    async def get(self, user_id: int) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+
+        if entry is None:
+            return None
+
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+
+        return data
+
+    async def set(self, user_id: int, data: dict, ttl: float) -> None:
+        self._entries[user_id] = (time.monotonic() + ttl, data)
+
+    async def delete(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+
+# Per-process TTL + LRU cache of authenticated users, optionally backed by a
+# shared UserCacheBackend. Entries expire after `ttl` seconds so changes made
+# by another worker are picked up even without an explicit invalidation.
+class UserCache:
+
+    def __init__(self, max_size: int, ttl: float, backend: Optional[UserCacheBackend] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = backend
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries: OrderedDict[int, tuple[float, CachedUser]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    async def get(self, user_id: int) -> Optional[CachedUser]:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(user_id)
+
+        if entry is not None:
+            expires_at, user = entry
+
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return user
+
+            del self._entries[user_id]
+
+        if self.backend is not None:
+            data = await self.backend.get(user_id)
+
+            if data is not None:
+                user = CachedUser(**data)
+                self._store(user)
+                self.shared_hits += 1
+                return user
+
+        self.misses += 1
+        return None
+
+    async def set(self, user: CachedUser):
+        if not self.enabled:
+            return
+
+        self._store(user)
+
+        if self.backend is not None:
+            await self.backend.set(user.id, asdict(user), self.ttl)
+
+    async def invalidate(self, user_id: int):
+        self._evict(user_id)
+
+        if self.backend is not None:
+            await self.backend.delete(user_id)
+
+    # For sync callers (ORM events): evicts locally right away and schedules
+    # the shared backend delete on the running loop
+    def invalidate_nowait(self, user_id: int):
+        self._evict(user_id)
+
+        if self.backend is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            loop.create_task(self.backend.delete(user_id))
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
+
+    def _store(self, user: CachedUser):
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _evict(self, user_id: int):
+        self._entries.pop(user_id, None)
+        self.invalidations += 1
+
+
+def _build_backend() -> Optional[UserCacheBackend]:
+    if settings.USER_CACHE_BACKEND == "none":
+        return None
+
+    if settings.USER_CACHE_BACKEND == "memory":
+        return InMemoryUserCacheBackend()
+
+    raise ValueError(f"Unknown USER_CACHE_BACKEND '{settings.USER_CACHE_BACKEND}'")
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    backend=_build_backend()
+)
+
+
+# Any ORM update or delete of a user (profile change, deactivation) drops it
+# from the cache. Bulk UPDATE/DELETE statements on users bypass these events
+# and must call user_cache.invalidate() themselves.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate_nowait(target.id)
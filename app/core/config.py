@@ -4,10 +4,120 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Settings:
+    # "development" or "production", picks the defaults below
+    APP_ENV = os.getenv("APP_ENV", "development")
+
     DATABASE_URL = os.getenv("DATABASE_URL")
+    # Optional read replica for listing endpoints, unset means the primary
+    DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+    # after a write, the user's reads go to the primary for this long
+    DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Database engine and pool. Each worker process holds up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections, keep workers * that below
+    # Postgres max_connections.
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10" if APP_ENV == "production" else "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10" if APP_ENV == "production" else "5"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5" if APP_ENV == "production" else "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # asyncpg prepared statement cache, set to 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    # server side statement_timeout in milliseconds, 0 disables it
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000" if APP_ENV == "production" else "0"))
     SECRET_KEY = os.getenv("SECRET_KEY")
     ALGORITHM = os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES= int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
     RESEND_API_KEY = os.getenv("RESEND_API_KEY")
 
-settings = Settings()
\ No newline at end of file
+    # Password hashing (Argon2id). Defaults match passlib's, changing them
+    # only affects new hashes, existing ones keep their own parameters.
+    ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+    ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+    # Authenticated user cache. USER_CACHE_BACKEND "memory" adds a shared
+    # second level (in-memory stand-in), "none" keeps it per process.
+    USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    USER_CACHE_BACKEND = os.getenv("USER_CACHE_BACKEND", "none")
+
+    # Trust the role in the JWT for role checks instead of loading the user
+    AUTH_ROLE_FROM_CLAIMS = os.getenv("AUTH_ROLE_FROM_CLAIMS", "false").lower() == "true"
+
+    # Email delivery ("resend" or "fake" for local runs and tests)
+    EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "resend")
+    EMAIL_FROM = os.getenv("EMAIL_FROM", "onboarding@resend.dev")
+    EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "4"))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+    EMAIL_POLL_INTERVAL_SECONDS = float(os.getenv("EMAIL_POLL_INTERVAL_SECONDS", "5"))
+    EMAIL_CLAIM_LEASE_SECONDS = int(os.getenv("EMAIL_CLAIM_LEASE_SECONDS", "300"))
+
+    # Pagination
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "20"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+    # Shop catalog cache. Entries are keyed by the shop's catalog_version so
+    # item edits show up at once, the TTL bounds how stale stock levels get.
+    CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "1000"))
+
+    # Search ("postgres" full text search, or "like" for plain ILIKE matching)
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "postgres")
+    SEARCH_MAX_TERMS = int(os.getenv("SEARCH_MAX_TERMS", "8"))
+
+    # Bulk item import: rows per upsert/commit and upload limits
+    ITEM_IMPORT_CHUNK_SIZE = int(os.getenv("ITEM_IMPORT_CHUNK_SIZE", "500"))
+    ITEM_IMPORT_MAX_ROWS = int(os.getenv("ITEM_IMPORT_MAX_ROWS", "50000"))
+    ITEM_IMPORT_MAX_ERRORS = int(os.getenv("ITEM_IMPORT_MAX_ERRORS", "1000"))
+    ITEM_IMPORT_MAX_JSON_BYTES = int(os.getenv("ITEM_IMPORT_MAX_JSON_BYTES", str(5 * 1024 * 1024)))
+    ITEM_IMPORT_MAX_LINE_BYTES = int(os.getenv("ITEM_IMPORT_MAX_LINE_BYTES", str(64 * 1024)))
+
+    # Order export: rows fetched per round trip from the server side cursor
+    ORDER_EXPORT_CHUNK_ROWS = int(os.getenv("ORDER_EXPORT_CHUNK_ROWS", "1000"))
+
+    # Sales analytics, longest date range per request
+    ANALYTICS_MAX_DAYS = int(os.getenv("ANALYTICS_MAX_DAYS", "366"))
+
+    # Order events over SSE/WebSocket. ORDER_EVENTS_BACKEND "memory" only
+    # reaches clients of the same worker, "postgres" fans out with LISTEN/NOTIFY.
+    ORDER_EVENTS_BACKEND = os.getenv("ORDER_EVENTS_BACKEND", "memory")
+    ORDER_EVENTS_QUEUE_SIZE = int(os.getenv("ORDER_EVENTS_QUEUE_SIZE", "100"))
+    ORDER_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("ORDER_EVENTS_MAX_SUBSCRIBERS", "10000"))
+    ORDER_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("ORDER_EVENTS_KEEPALIVE_SECONDS", "15"))
+    ORDER_EVENTS_RECONNECT_SECONDS = float(os.getenv("ORDER_EVENTS_RECONNECT_SECONDS", "2"))
+
+    # Idempotency-Key on order creation: how long a key is remembered, and
+    # how often expired keys are purged
+    IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS", "3600"))
+    IDEMPOTENCY_CLEANUP_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_CLEANUP_BATCH_SIZE", "5000"))
+
+    # Server-Timing header with app and SQL time on every response. Off in
+    # production by default, it tells clients how many queries a route runs.
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false" if APP_ENV == "production" else "true").lower() == "true"
+
+    # Development/staging SQL debugging: log every request's statements with
+    # call sites, as a warning when it runs more than QUERY_DEBUG_MAX_STATEMENTS
+    # statements, repeats one more than QUERY_DEBUG_MAX_REPEATS times (N+1) or
+    # has one slower than QUERY_DEBUG_SLOW_MS. Costs a stack walk per statement.
+    QUERY_DEBUG = os.getenv("QUERY_DEBUG", "false").lower() == "true"
+    QUERY_DEBUG_MAX_STATEMENTS = int(os.getenv("QUERY_DEBUG_MAX_STATEMENTS", "15"))
+    QUERY_DEBUG_MAX_REPEATS = int(os.getenv("QUERY_DEBUG_MAX_REPEATS", "3"))
+    QUERY_DEBUG_SLOW_MS = float(os.getenv("QUERY_DEBUG_SLOW_MS", "100"))
+
+    # Run route results through FastAPI's response_model validation and
+    # serialization again instead of the model_response() fast path, to catch
+    # a schema drifting from what the routes return
+    VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "false").lower() == "true"
+
+    # Orders
+    MAX_CART_LINES = int(os.getenv("MAX_CART_LINES", "100"))
+    MAX_BULK_STATUS_ORDERS = int(os.getenv("MAX_BULK_STATUS_ORDERS", "200"))
+
+settings = Settings()
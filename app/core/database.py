@@ -1,13 +1,107 @@
+import time
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.jwt import get_optional_user_id
 
 Base = declarative_base()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True
-)
+
+# Checkout metrics for a connection pool. Kept outside the pool so they
+# survive it being recreated (engine.dispose(), invalidation).
+class PoolMetrics:
+    # upper bounds of the checkout wait histogram, in seconds
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self.checkouts_total = 0
+        self.timeouts_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # one counter per bucket plus a last one for anything slower
+        self.wait_buckets = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.checkouts_total += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                self.wait_buckets[i] += 1
+                return
+
+        self.wait_buckets[-1] += 1
+
+
+# one PoolMetrics per engine, keyed by the pool's logging name
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+# Queue pool that records how long each checkout took, waiting for a free
+# connection included. Time spent here is time a request sat idle because
+# the pool was too small.
+class InstrumentedPool(AsyncAdaptedQueuePool):
+
+    def connect(self):
+        metrics = pool_metrics.setdefault(self.logging_name, PoolMetrics())
+        started = time.perf_counter()
+
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            metrics.timeouts_total += 1
+            raise
+
+        metrics.observe(time.perf_counter() - started)
+        return connection
+
+
+def _connect_args(url: str) -> dict:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+
+    connect_args = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+    }
+
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+        }
+
+    return connect_args
+
+
+def _create_engine(url: str, name: str):
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(url)
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# replica for read only endpoints, the primary itself when none is configured
+read_engine = engine
+if settings.DATABASE_READ_URL:
+    read_engine = _create_engine(settings.DATABASE_READ_URL, "replica")
 
 async_session_maker = sessionmaker(
     engine,
@@ -15,6 +109,116 @@ async_session_maker = sessionmaker(
     expire_on_commit=False
 )
 
-async def get_db():
+read_session_maker = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+# Users who wrote to the primary in the last `window` seconds. Their reads
+# stay on the primary until the replica has surely caught up, so a customer
+# sees the order they just placed. Per process: run several workers behind
+# sticky sessions or keep the window above the replica's worst lag.
+class RecentWriters:
+
+    def __init__(self, window: float, max_size: int = 100000):
+        self.window = window
+        self.max_size = max_size
+        self._until: dict[int, float] = {}
+
+    def mark(self, user_id: int):
+        if len(self._until) >= self.max_size:
+            self._prune()
+
+        self._until[user_id] = time.monotonic() + self.window
+
+    def is_recent(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+
+        if until is None:
+            return False
+
+        if until < time.monotonic():
+            self._until.pop(user_id, None)
+            return False
+
+        return True
+
+    def _prune(self):
+        now = time.monotonic()
+        self._until = {user_id: until for user_id, until in self._until.items() if until >= now}
+
+
+recent_writers = RecentWriters(window=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+# Session on the primary. Remembers who the caller is so a commit that wrote
+# anything opens their read-your-writes window.
+async def get_db(user_id: Optional[int] = Depends(get_optional_user_id)):
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        session.info["user_id"] = user_id
+        yield session
+
+
+# Session for read only endpoints: the replica, or the primary for callers
+# inside their read-your-writes window
+async def get_read_db(user_id: Optional[int] = Depends(get_optional_user_id)):
+    session_maker = read_session_maker
+
+    if user_id is not None and recent_writers.is_recent(user_id):
+        session_maker = async_session_maker
+
+    async with session_maker() as session:
+        yield session
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_recent_writer(session):
+    wrote = session.info.pop("wrote", False)
+    user_id = session.info.get("user_id")
+
+    if wrote and user_id is not None:
+        recent_writers.mark(user_id)
+
+
+# Current pool usage plus checkout wait metrics. saturation is the share of
+# the pool's capacity (size + overflow) in use right now.
+def pool_stats(pool_engine=engine) -> dict:
+    pool = pool_engine.pool
+    metrics = pool_metrics.get(pool.logging_name) or PoolMetrics()
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+        "checkouts_total": metrics.checkouts_total,
+        "checkout_timeouts_total": metrics.timeouts_total,
+        "checkout_wait_seconds_total": round(metrics.wait_seconds_total, 6),
+        "checkout_wait_seconds_max": round(metrics.wait_seconds_max, 6),
+        "checkout_wait_buckets": dict(zip(
+            [str(bound) for bound in PoolMetrics.BUCKETS] + ["+Inf"],
+            metrics.wait_buckets
+        ))
+    }
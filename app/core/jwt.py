@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta, timezone
-from jose import jwt
+from typing import Optional
+from fastapi import Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, jwt
 from app.core.config import settings
 
 def create_access_token(data: dict, expires_delta=None):
@@ -11,3 +14,35 @@ def create_access_token(data: dict, expires_delta=None):
 
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+
+
+# raises jose.JWTError when the token is invalid or expired
+def decode_access_token(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+_optional_bearer = HTTPBearer(auto_error=False)
+
+
+# Decoded token of the request, None without a valid one. FastAPI caches it
+# per request, so the database sessions and app.auth.dependencies share one
+# decode.
+async def get_optional_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_optional_bearer)
+) -> Optional[dict]:
+    if credentials is None:
+        return None
+
+    try:
+        return decode_access_token(credentials.credentials)
+    except JWTError:
+        return None
+
+
+# id of the caller if the request carries a valid token, None otherwise.
+# Authentication itself is still done by app.auth.dependencies.
+async def get_optional_user_id(claims: Optional[dict] = Depends(get_optional_claims)) -> Optional[int]:
+    if claims is None:
+        return None
+
+    return claims.get("user_id")
@@ -0,0 +1,264 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import engine, read_engine, pool_metrics, PoolMetrics
+from app.core.query_debug import active_recorders, record_queries, log_request_queries
+
+
+# Cumulative histogram in the Prometheus sense, one series per label tuple
+class Histogram:
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+
+        # labels -> [per bucket counts..., +Inf count], sum
+        self._series: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[labels] = series
+
+        counts, total = series
+        total[0] += value
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                return
+
+        counts[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+
+        for labels, (counts, total) in self._series.items():
+            label_text = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+
+            lines.append(f"{self.name}_sum{{{label_text}}} {total[0]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response is fully sent, by route template.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    ("method", "route", "status")
+)
+
+request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, a high count points at an N+1.",
+    (1, 2, 3, 5, 10, 20, 50, 100),
+    ("method", "route")
+)
+
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request.",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+    ("method", "route")
+)
+
+response_size = Histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    (100, 1000, 10000, 100000, 1000000, 10000000),
+    ("method", "route")
+)
+
+
+# SQL work done on behalf of the current request
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request. SQLAlchemy runs the
+# sync engine events in a greenlet that shares the calling task's context, so
+# the events below see it too. Background tasks have none.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = current_request_stats.get()
+
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+    for recorder in active_recorders.get():
+        recorder.add(statement, elapsed)
+
+
+# a statement that failed never reaches after_cursor_execute
+def _handle_error(exception_context):
+    connection = exception_context.connection
+
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(async_engine):
+    sync_engine = async_engine.sync_engine
+
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+instrument_engine(engine)
+instrument_engine(read_engine)
+
+
+# Pure ASGI middleware (no BaseHTTPMiddleware, so streaming responses are not
+# buffered) recording latency, SQL count and time, and response size per
+# route template. Routes are labelled by their path template, never by the
+# raw path, to keep the number of series bounded.
+class MetricsMiddleware:
+
+    def __init__(
+        self,
+        app,
+        server_timing: bool = settings.SERVER_TIMING_ENABLED,
+        query_debug: bool = settings.QUERY_DEBUG
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.query_debug = query_debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+
+        status_code = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_bytes
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                if self.server_timing:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", _server_timing(stats, time.perf_counter() - started).encode())
+                    ]
+
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+
+            await send(message)
+
+        recorder = None
+
+        try:
+            if self.query_debug:
+                with record_queries() as recorder:
+                    await self.app(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            route_label = route.path if route is not None else "unmatched"
+            method = scope["method"]
+
+            request_duration.observe((method, route_label, str(status_code)), elapsed)
+            request_queries.observe((method, route_label), stats.queries)
+            request_db_time.observe((method, route_label), stats.db_seconds)
+            response_size.observe((method, route_label), body_bytes)
+
+            if recorder is not None:
+                log_request_queries(recorder, method, scope["path"], route_label, status_code, elapsed)
+
+
+# time until the response headers went out, streamed bodies come after that
+def _server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (
+        f"app;dur={elapsed * 1000:.1f}, "
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    )
+
+
+# Prometheus lines for components' stats() dicts, keyed by their label text
+# ("" for none). `*_total` keys are counters, any other number a gauge.
+def stats_metrics(prefix: str, stats_by_labels: dict[str, dict]) -> list[str]:
+    lines = []
+    names = {}
+
+    for labels, stats in stats_by_labels.items():
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+
+            names.setdefault(key, []).append((labels, value))
+
+    for key, series in names.items():
+        name = f"{prefix}_{key}"
+        lines.append(f"# TYPE {name} {'counter' if key.endswith('_total') else 'gauge'}")
+
+        for labels, value in series:
+            lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+
+    return lines
+
+
+# checkout wait of every pool, from the PoolMetrics the pools keep
+def pool_wait_metrics() -> list[str]:
+    name = "db_pool_checkout_wait_seconds"
+    lines = [f"# HELP {name} Time waited for a pooled connection.", f"# TYPE {name} histogram"]
+
+    for pool_name, metrics in pool_metrics.items():
+        cumulative = 0
+        for bound, count in zip(PoolMetrics.BUCKETS + ("+Inf",), metrics.wait_buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{{pool="{pool_name}",le="{bound}"}} {cumulative}')
+
+        lines.append(f'{name}_sum{{pool="{pool_name}"}} {metrics.wait_seconds_total}')
+        lines.append(f'{name}_count{{pool="{pool_name}"}} {metrics.checkouts_total}')
+
+    return lines
+
+
+def request_metrics() -> list[str]:
+    lines = []
+
+    for histogram in (request_duration, request_queries, request_db_time, response_size):
+        lines += histogram.render()
+
+    return lines
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import greenlet
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+_INTERNAL_FILES = {
+    os.path.join(_APP_DIR, "core", "query_debug.py"),
+    os.path.join(_APP_DIR, "core", "metrics.py")
+}
+
+# parameter lists, expanded IN lists and literals vary between executions
+# of what is the same query, they are folded so repeats can be counted
+_PLACEHOLDER = r"(?:\$\d+|%\(\w+\)s|\?)(?:::[\w ]+?)?"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+def _first_app_frame(frame):
+    while frame is not None:
+        filename = frame.f_code.co_filename
+
+        if filename.startswith(_APP_DIR) and filename not in _INTERNAL_FILES:
+            return f"{os.path.relpath(filename, _ROOT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+    return None
+
+
+# Application line that issued the statement. AsyncSession runs the ORM in a
+# child greenlet, so the awaiting router code is found on the parent's stack.
+def call_site() -> str:
+    site = _first_app_frame(sys._getframe(1))
+
+    if site is None:
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            site = _first_app_frame(parent.gr_frame)
+
+    return site or "?"
+
+
+@dataclass
+class StatementRecord:
+    statement: str
+    seconds: float
+    call_site: str
+
+
+# Every statement executed while it is active, see record_queries()
+class QueryRecorder:
+
+    def __init__(self):
+        self.statements: list[StatementRecord] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(record.seconds for record in self.statements)
+
+    def add(self, statement: str, seconds: float):
+        self.statements.append(StatementRecord(statement_shape(statement), seconds, call_site()))
+
+    # statement shapes run at least min_count times, the N+1 signature
+    def repeated(self, min_count: int) -> list[dict]:
+        counts = Counter(record.statement for record in self.statements)
+
+        return [
+            {
+                "statement": shape,
+                "count": count,
+                "call_sites": sorted({r.call_site for r in self.statements if r.statement == shape})
+            }
+            for shape, count in counts.most_common()
+            if count >= min_count
+        ]
+
+    def slow(self, min_seconds: float) -> list[StatementRecord]:
+        return [record for record in self.statements if record.seconds >= min_seconds]
+
+    def summary(self) -> str:
+        return "\n".join(
+            f"  {record.seconds * 1000:7.1f}ms  {record.call_site}\n            {record.statement[:300]}"
+            for record in self.statements
+        )
+
+
+# Recorders of the current context. A statement is added to all of them, so
+# a test's recorder and the per-request one of QUERY_DEBUG can be nested.
+active_recorders: ContextVar[tuple[QueryRecorder, ...]] = ContextVar("active_recorders", default=())
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    token = active_recorders.set(active_recorders.get() + (recorder,))
+
+    try:
+        yield recorder
+    finally:
+        active_recorders.reset(token)
+
+
+# Fails when the block runs more than `limit` statements, or any statement
+# shape more than `max_repeats` times. Works with in-process clients
+# (httpx.ASGITransport, TestClient), which run the app in the caller's context.
+#
+#     with assert_max_queries(3):
+#         await client.get("/orders/me", headers=headers)
+@contextmanager
+def assert_max_queries(limit: int, max_repeats: int | None = None):
+    with record_queries() as recorder:
+        yield recorder
+
+    if recorder.count > limit:
+        raise AssertionError(f"{recorder.count} queries, expected at most {limit}:\n{recorder.summary()}")
+
+    if max_repeats is not None:
+        repeated = recorder.repeated(max_repeats + 1)
+        if repeated:
+            raise AssertionError(
+                f"statement repeated {repeated[0]['count']} times, expected at most {max_repeats}:\n"
+                f"  {repeated[0]['statement'][:300]}\n  from {', '.join(repeated[0]['call_sites'])}"
+            )
+
+
+# Structured report of one request's statements. Requests over the
+# QUERY_DEBUG_* thresholds are logged as warnings with every statement and
+# its call site, the others at debug level.
+def log_request_queries(recorder: QueryRecorder, method: str, path: str, route: str, status: int, seconds: float):
+    problems = []
+
+    if recorder.count > settings.QUERY_DEBUG_MAX_STATEMENTS:
+        problems.append("too_many_statements")
+
+    repeated = recorder.repeated(settings.QUERY_DEBUG_MAX_REPEATS + 1)
+    if repeated:
+        problems.append("repeated_statements")
+
+    slow = recorder.slow(settings.QUERY_DEBUG_SLOW_MS / 1000)
+    if slow:
+        problems.append("slow_statements")
+
+    level = logging.WARNING if problems else logging.DEBUG
+
+    if not logger.isEnabledFor(level):
+        return
+
+    report = {
+        "event": "sql_report",
+        "method": method,
+        "path": path,
+        "route": route,
+        "status": status,
+        "duration_ms": round(seconds * 1000, 1),
+        "statements": recorder.count,
+        "db_ms": round(recorder.db_seconds * 1000, 1),
+        "problems": problems,
+        "repeated": repeated,
+        "slow": [
+            {"ms": round(record.seconds * 1000, 1), "call_site": record.call_site, "statement": record.statement}
+            for record in slow
+        ],
+        "log": [
+            {"ms": round(record.seconds * 1000, 1), "call_site": record.call_site, "statement": record.statement}
+            for record in recorder.statements
+        ]
+    }
+
+    logger.log(level, json.dumps(report), extra={"sql_report": report})
+
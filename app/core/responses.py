@@ -0,0 +1,65 @@
+from decimal import Decimal
+from functools import lru_cache
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from app.core.config import settings
+
+
+# Decimal goes out as a string, the way pydantic's JSON mode writes the
+# money fields, so both paths below produce the same body
+def _orjson_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Default response class of the app. Routes returning dicts and the
+# response_model output FastAPI builds are encoded by orjson instead of
+# json.dumps. datetimes are written natively, no isoformat() needed.
+class ORJSONResponse(JSONResponse):
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Body written straight from pydantic models by pydantic-core, no dict in
+# between: Decimal, datetime and nested models are encoded in one pass
+class ModelResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, content, adapter: TypeAdapter):
+        self.adapter = adapter
+        super().__init__(content)
+
+    def render(self, content) -> bytes:
+        return self.adapter.dump_json(content)
+
+
+@lru_cache(maxsize=None)
+def response_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+# Fast path for routes with a response_model. Returning a Response makes
+# FastAPI skip its own pass (validate into the model, dump to a dict, encode
+# the dict), so ORM objects and rows are validated into `schema` once and
+# encoded from the models. Content the route already built as `schema` is
+# trusted and not validated again.
+#
+# Keep response_model on the route for the OpenAPI docs. VALIDATE_RESPONSES
+# hands the content back to FastAPI's full validation instead.
+def model_response(schema, content):
+    if settings.VALIDATE_RESPONSES:
+        return content
+
+    adapter = response_adapter(schema)
+
+    if not (isinstance(schema, type) and isinstance(content, schema)):
+        content = adapter.validate_python(content, from_attributes=True)
+
+    return ModelResponse(content, adapter)
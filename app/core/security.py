@@ -1,6 +1,18 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from app.core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM
+)
 
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -8,3 +20,74 @@ def hash_password(password: str):
 def verify_password(plain: str, hashed: str):
     return pwd_context.verify(plain, hashed)
 
+
+class PasswordHashingBusy(Exception):
+    pass
+
+
+# runs in the worker thread, also reports when the work actually started
+def _timed(fn, *args):
+    started = time.perf_counter()
+    return fn(*args), started
+
+
+# Runs Argon2 on a bounded thread pool so a hash doesn't block the event loop
+# (argon2-cffi releases the GIL while hashing). At most `workers` hashes run
+# at once and at most `max_queue` wait behind them, past that callers get
+# PasswordHashingBusy instead of piling up during a login storm.
+class PasswordHasher:
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self.pending = 0
+        self.completed_total = 0
+        self.rejected_total = 0
+        self.wait_seconds_total = 0.0
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, plain, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": min(self.pending, self.workers),
+            "queue_depth": max(0, self.pending - self.workers),
+            "completed_total": self.completed_total,
+            "rejected_total": self.rejected_total,
+            "wait_seconds_total": self.wait_seconds_total
+        }
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected_total += 1
+            raise PasswordHashingBusy()
+
+        self.pending += 1
+        submitted = time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started = await loop.run_in_executor(self._executor, _timed, fn, *args)
+        finally:
+            self.pending -= 1
+
+        # time spent queued behind other hashes, the hash itself is excluded
+        self.completed_total += 1
+        self.wait_seconds_total += max(0.0, started - submitted)
+
+        return result
+
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
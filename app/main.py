@@ -1,14 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.routers.auth_router import router as auth_router
 from app.routers.user_router import router as user_router
 from app.routers.shop_router import router as shop_router
 from app.routers.item_router import router as item_router
 from app.routers.order_router import router as order_router
+from app.routers.search_router import router as search_router
+from app.routers.analytics_router import router as analytics_router
+from app.routers.order_events_router import router as order_events_router
+from app.utils.email_outbox import email_dispatcher
+from app.utils.order_events import order_events
+from app.utils.idempotency import idempotency_cleaner
+from app.utils.catalog_cache import catalog_cache
+from app.auth.user_cache import user_cache
+from app.core.security import password_hasher
+from app.core.database import engine, read_engine, pool_stats
+from app.core.metrics import MetricsMiddleware, request_metrics, pool_wait_metrics, stats_metrics
+from app.core.responses import ORJSONResponse
 
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await email_dispatcher.start()
+    await order_events.start()
+    await idempotency_cleaner.start()
+    yield
+    await idempotency_cleaner.stop()
+    await order_events.stop()
+    await email_dispatcher.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 origins = [
@@ -20,17 +45,55 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["Server-Timing"]
 )
 
+app.add_middleware(MetricsMiddleware)
+
 
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(shop_router)
 app.include_router(item_router)
 app.include_router(order_router)
+app.include_router(search_router)
+app.include_router(analytics_router)
+app.include_router(order_events_router)
 
 @app.get("/")
 def home():
     return {"message": "This is home"}
 
+
+# connection pool usage of this worker, for sizing pool_size/max_overflow
+@app.get("/health/db")
+def db_health():
+    stats = {"primary": pool_stats(engine)}
+
+    if read_engine is not engine:
+        stats["replica"] = pool_stats(read_engine)
+
+    return stats
+
+
+# Prometheus metrics of this worker: per route latency, SQL statements and
+# time, response sizes, plus pools, caches and background workers. Keep it
+# off the public network, scrape every worker.
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    pools = {'pool="primary"': pool_stats(engine)}
+
+    if read_engine is not engine:
+        pools['pool="replica"'] = pool_stats(read_engine)
+
+    lines = request_metrics() + pool_wait_metrics()
+    lines += stats_metrics("db_pool", pools)
+    lines += stats_metrics("catalog_cache", {"": catalog_cache.stats()})
+    lines += stats_metrics("user_cache", {"": user_cache.stats()})
+    lines += stats_metrics("password_hasher", {"": password_hasher.stats()})
+    lines += stats_metrics("email_dispatcher", {"": email_dispatcher.stats()})
+    lines += stats_metrics("order_events", {"": order_events.stats()})
+    lines += stats_metrics("idempotency_keys", {"": {"deleted_total": idempotency_cleaner.deleted_total}})
+
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
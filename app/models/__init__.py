@@ -4,6 +4,9 @@ from .shop import Shop
 from .item import Item
 from .order import Order
 from .order_item import OrderItem
-from .enums import UserType, ItemStatus
+from .email_outbox import EmailOutbox
+from .sales_rollup import ShopDailySales, ItemDailySales
+from .idempotency_key import IdempotencyKey
+from .enums import UserType, ItemStatus, EmailStatus
 
-__all__ = ["User", "Shop", "Item", "Order", "OrderItem", "Base"]
\ No newline at end of file
+__all__ = ["User", "Shop", "Item", "Order", "OrderItem", "EmailOutbox", "ShopDailySales", "ItemDailySales", "IdempotencyKey", "Base"]
\ No newline at end of file
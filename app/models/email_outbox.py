@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index, Text
+
+from .base import Base
+from .enums import EmailStatus
+
+
+# Transactional outbox: rows are written in the same transaction as the
+# change that triggers the email and delivered later by the EmailDispatcher.
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    to_email = Column(String(255), nullable=False)
+
+    subject = Column(String(255), nullable=False)
+
+    html = Column(Text, nullable=False)
+
+    status = Column(Enum(EmailStatus), nullable=False, default=EmailStatus.PENDING)
+
+    attempts = Column(Integer, nullable=False, default=0)
+
+    next_attempt_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('idx_email_outbox_due', 'status', 'next_attempt_at'),
+    )
@@ -8,4 +8,9 @@ class ItemStatus(str, PyEnum):
     PENDING = "pending"
     READY = "ready"
     PICKED = "picked"
-    CANCELLED = "cancelled"
\ No newline at end of file
+    CANCELLED = "cancelled"
+
+class EmailStatus(str, PyEnum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+# Idempotency-Key of a POST /orders/create, written in the same transaction as
+# the order it created together with the response to replay on a retry.
+# The unique (user_id, key) is what serializes concurrent duplicates.
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    key = Column(String(255), nullable=False)
+
+    # sha256 of the request body, a key reused for another request is refused
+    request_hash = Column(String(64), nullable=False)
+
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True)
+
+    status_code = Column(Integer, nullable=True)
+
+    response_body = Column(JSONB, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'key', name='uq_idempotency_user_key'),
+        Index('idx_idempotency_expires_at', 'expires_at'),
+    )
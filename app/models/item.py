@@ -1,7 +1,8 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, Index
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 from .base import Base
 
@@ -14,6 +15,9 @@ class Item(Base):
 
     name = Column(String(255), nullable=False, index=True)
 
+    # shop defined stock keeping unit, unique per shop, keys bulk imports
+    sku = Column(String(100))
+
     description = Column(Text)
 
     price = Column(Numeric(10, 2), nullable=False)
@@ -24,6 +28,18 @@ class Item(Base):
 
     category = Column(String(100), index=True)
 
+    # full text search document, name ranks above category above
+    # description. Deferred, only search queries load it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+            persisted=True
+        )
+    ))
+
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -36,5 +52,7 @@ class Item(Base):
     __table_args__ = (
         Index('idx_shop_available', 'shop_id', 'is_available'),
         Index('idx_shop_category', 'shop_id', 'category'),
+        Index('idx_items_search', 'search_vector', postgresql_using='gin'),
+        Index('uq_items_shop_sku', 'shop_id', 'sku', unique=True),
     )
 
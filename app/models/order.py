@@ -44,5 +44,7 @@ class Order(Base):
         Index('idx_user_status', 'user_id', 'status'),
         Index('idx_shop_status', 'shop_id', 'status'),
         Index('idx_created_at', 'created_at'),
+        Index('idx_shop_created_at', 'shop_id', 'created_at', 'id'),
+        Index('idx_user_created_at', 'user_id', 'created_at', 'id'),
     )
 
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Numeric, Index
+
+from .base import Base
+
+
+# Per shop, per day (UTC, by order creation) sales totals. Kept up to date
+# incrementally by the order endpoints, rebuilt from history by
+# `python -m app.utils.sales_rollup`. Cancelled orders stay in the gross
+# columns and are counted again in the cancelled_* ones.
+class ShopDailySales(Base):
+    __tablename__ = "shop_daily_sales"
+
+    shop_id = Column(Integer, ForeignKey("shops.id", ondelete="CASCADE"), primary_key=True)
+
+    day = Column(Date, primary_key=True)
+
+    orders_count = Column(Integer, nullable=False, default=0)
+
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+    items_sold = Column(Integer, nullable=False, default=0)
+
+    cancelled_count = Column(Integer, nullable=False, default=0)
+
+    cancelled_revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+    cancelled_items = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+# Same per item, for the top items of a day
+class ItemDailySales(Base):
+    __tablename__ = "item_daily_sales"
+
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+
+    day = Column(Date, primary_key=True)
+
+    shop_id = Column(Integer, ForeignKey("shops.id", ondelete="CASCADE"), nullable=False)
+
+    orders_count = Column(Integer, nullable=False, default=0)
+
+    quantity = Column(Integer, nullable=False, default=0)
+
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+    cancelled_quantity = Column(Integer, nullable=False, default=0)
+
+    cancelled_revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_item_daily_sales_shop_day', 'shop_id', 'day'),
+    )
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 
 from .base import Base
@@ -23,6 +24,20 @@ class Shop(Base):
 
     is_active = Column(Boolean, default=True)
 
+    # full text search document over name and description. Deferred, only
+    # search queries load it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+            persisted=True
+        )
+    ))
+
+    # bumped whenever the shop's items change, keys the catalog cache
+    catalog_version = Column(Integer, nullable=False, default=1, server_default="1")
+
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -36,5 +51,6 @@ class Shop(Base):
 
     __table_args__ = (
         Index('idx_owner_active', 'owner_id', 'is_active'),
+        Index('idx_shops_search', 'search_vector', postgresql_using='gin'),
     )
 
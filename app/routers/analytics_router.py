@@ -0,0 +1,150 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.models.item import Item
+from app.models.shop import Shop
+from app.models.sales_rollup import ShopDailySales, ItemDailySales
+from app.schemas.analytics import ShopSalesReport
+from app.auth.dependencies import require_shop_owner
+
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+def _figures(orders, cancelled, gross_revenue, cancelled_revenue, items_sold, cancelled_items) -> dict:
+    return {
+        "orders": orders,
+        "cancelled_orders": cancelled,
+        "cancellation_rate": round(cancelled / orders, 4) if orders else 0.0,
+        "gross_revenue": gross_revenue,
+        "revenue": gross_revenue - cancelled_revenue,
+        "items_sold": items_sold - cancelled_items
+    }
+
+
+# GET daily sales of a shop (Shop Owner Only). Reads the rollup tables only,
+# never orders or order_items, so the cost depends on the number of days
+# asked for, not on the shop's order volume. Both dates are inclusive (UTC).
+@router.get("/shop/{shop_id}/daily", response_model=ShopSalesReport)
+async def get_shop_daily_sales(
+    shop_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    top: int = Query(3, ge=0, le=20),
+    current_user = Depends(require_shop_owner),
+    db: AsyncSession = Depends(get_read_db)
+):
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="date_from must not be after date_to"
+        )
+
+    if (date_to - date_from).days >= settings.ANALYTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ANALYTICS_MAX_DAYS} days per request"
+        )
+
+    # 1. check if shop belongs to current owner
+    result = await db.execute(
+        select(Shop.id).where(Shop.id == shop_id, Shop.owner_id == current_user.id)
+    )
+
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=403,
+            detail= "You are not the owner of this shop"
+        )
+
+    # 2. shop totals per day
+    result = await db.execute(
+        select(ShopDailySales)
+        .where(
+            ShopDailySales.shop_id == shop_id,
+            ShopDailySales.day.between(date_from, date_to)
+        )
+    )
+    shop_days = {row.day: row for row in result.scalars().all()}
+
+    # 3. best selling items per day by net quantity, ranked in the database
+    top_items = {}
+
+    if top and shop_days:
+        net_quantity = ItemDailySales.quantity - ItemDailySales.cancelled_quantity
+        ranked = (
+            select(
+                ItemDailySales.item_id,
+                ItemDailySales.day,
+                net_quantity.label("quantity"),
+                (ItemDailySales.revenue - ItemDailySales.cancelled_revenue).label("revenue"),
+                func.row_number().over(
+                    partition_by=ItemDailySales.day,
+                    order_by=(net_quantity.desc(), ItemDailySales.item_id)
+                ).label("position")
+            )
+            .where(
+                ItemDailySales.shop_id == shop_id,
+                ItemDailySales.day.between(date_from, date_to),
+                net_quantity > 0
+            )
+            .subquery()
+        )
+
+        result = await db.execute(
+            select(ranked.c.item_id, ranked.c.day, ranked.c.quantity, ranked.c.revenue, Item.name)
+            .join(Item, Item.id == ranked.c.item_id)
+            .where(ranked.c.position <= top)
+            .order_by(ranked.c.day, ranked.c.position)
+        )
+
+        for row in result.all():
+            top_items.setdefault(row.day, []).append({
+                "item_id": row.item_id,
+                "name": row.name,
+                "quantity": row.quantity,
+                "revenue": row.revenue
+            })
+
+    # 4. every day of the range, zeros where nothing was sold
+    days = []
+    totals = [0, 0, Decimal("0.00"), Decimal("0.00"), 0, 0]
+
+    for offset in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=offset)
+        row = shop_days.get(day)
+
+        counters = [0, 0, Decimal("0.00"), Decimal("0.00"), 0, 0]
+        if row is not None:
+            counters = [
+                row.orders_count,
+                row.cancelled_count,
+                row.revenue,
+                row.cancelled_revenue,
+                row.items_sold,
+                row.cancelled_items
+            ]
+
+        totals = [total + value for total, value in zip(totals, counters)]
+
+        days.append({
+            "day": day,
+            **_figures(*counters),
+            "top_items": top_items.get(day, [])
+        })
+
+    return {
+        "shop_id": shop_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "totals": _figures(*totals),
+        "days": days
+    }
@@ -3,7 +3,7 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.core.security import verify_password, hash_password
+from app.core.security import password_hasher, PasswordHashingBusy
 from app.core.jwt import create_access_token
 from app.schemas.auth import RegisterRequest, LoginRequest, Token
 from app.models.user import User
@@ -12,6 +12,15 @@ from app.core.config import settings
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
+# too many password hashes queued, ask the client to come back shortly
+def _hashing_busy():
+    return HTTPException(
+        status_code=503,
+        detail="Too many login attempts in progress, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+
 # Register a user 
 @router.post("/register")
 async def register_user(
@@ -29,8 +38,14 @@ async def register_user(
             detail="Email alrady registered"
         )
     
-    # hash password
-    hashed = hash_password(data.password)
+    # hash password, off the event loop. Hand the connection back to the
+    # pool while we wait, the insert below checks one out again.
+    await db.close()
+
+    try:
+        hashed = await password_hasher.hash(data.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
 
     new_user = User(
         email = data.email,
@@ -67,7 +82,16 @@ async def login_user(
             detail= "User not found"
         )
     
-    if not verify_password(data.password, user.hashed_password):
+    # nothing else to read, free the connection before the slow part.
+    # close() detaches `user` with its loaded columns intact.
+    await db.close()
+
+    try:
+        password_ok = await password_hasher.verify(data.password, user.hashed_password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
+
+    if not password_ok:
         raise HTTPException(
             status_code=400,
             detail= "Password and Hashed pass not match verify"
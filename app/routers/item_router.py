@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, status
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.database import get_db
+from sqlalchemy import select, update, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
 from app.models.shop import Shop
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate
+from app.schemas.item import ItemImportRow, ItemImportResponse
 from app.auth.dependencies import require_shop_owner
+from app.utils.catalog_cache import catalog_cache, etag_matches
+from app.utils.item_import import iter_import_rows, ImportTruncated
 
 
 router = APIRouter(prefix="/items", tags=["Items"])
 
+catalog_adapter = TypeAdapter(list[ItemResponse])
+
 
 # add item (shop_owner only, and must own the shop)
 @router.post("/{shop_id}/add", response_model=ItemResponse)
@@ -39,6 +50,7 @@ async def add_item(
     # create item
     new_item = Item(
         name = data.name,
+        sku = data.sku,
         description = data.description,
         price = data.price,
         is_available = data.is_available,
@@ -49,7 +61,18 @@ async def add_item(
 
     db.add(new_item)
 
-    await db.commit()
+    # invalidates cached catalogs of this shop
+    shop.catalog_version = Shop.catalog_version + 1
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="An item with this SKU already exists in the shop"
+        )
+
     await db.refresh(new_item)
 
     return new_item
@@ -88,10 +111,233 @@ async def update_item(
     for key, value in updated_data.items():
         setattr(item, key, value)
 
+    # invalidates cached catalogs of this shop
+    shop.catalog_version = Shop.catalog_version + 1
+
     await db.commit()
     await db.refresh(item)
     
     return item
 
 
+# GET a shop's catalog (public). Served from catalog_cache, keyed by the
+# shop's catalog_version, and revalidated with a strong ETag so unchanged
+# catalogs cost a 304 with no body.
+@router.get("/shop/{shop_id}", response_model=list[ItemResponse])
+async def get_shop_items(
+    shop_id: int,
+    category: Optional[str] = None,
+    is_available: Optional[bool] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # 1. current catalog version, also tells us the shop exists
+    result = await db.execute(select(Shop.catalog_version).where(Shop.id == shop_id))
+    version = result.scalar_one_or_none()
+
+    if version is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Shop not found"
+        )
+
+    # 2. cached body for this version and filters, or load and serialize it
+    key = (shop_id, version, category, is_available)
+    catalog = catalog_cache.get(key)
+
+    if catalog is None:
+        # served by idx_shop_category / idx_shop_available
+        query = select(Item).where(Item.shop_id == shop_id).order_by(Item.id)
+
+        if category is not None:
+            query = query.where(Item.category == category)
+
+        if is_available is not None:
+            query = query.where(Item.is_available == is_available)
+
+        result = await db.execute(query)
+        items = result.scalars().all()
+
+        catalog = catalog_cache.set(key, catalog_adapter.dump_json(
+            catalog_adapter.validate_python(items, from_attributes=True)
+        ))
+
+    # 3. clients must revalidate, unchanged catalogs get a bodiless 304
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(if_none_match, catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
+
+
+# columns an import row can set, everything but sku which is the key
+IMPORT_FIELDS = ("name", "description", "price", "is_available", "category", "stock_quantity")
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+# Upsert one chunk of import rows in one transaction and return how many
+# were created and updated. Rows are grouped by the fields they provided so
+# an update only overwrites those, an upload without a stock column keeps
+# the current stock. Every group is a single multi-row INSERT ... ON CONFLICT.
+async def _upsert_items(db: AsyncSession, shop_id: int, rows: list[tuple[int, ItemImportRow]]):
+    now = datetime.now(timezone.utc)
+    groups = {}
+
+    for row, item in rows:
+        provided = tuple(field for field in IMPORT_FIELDS if field in item.model_fields_set)
+        groups.setdefault(provided, []).append(item)
+
+    created = updated = 0
+
+    for provided, items in groups.items():
+        statement = pg_insert(Item).values([
+            {
+                **{field: getattr(item, field) for field in IMPORT_FIELDS},
+                "is_available": item.is_available is not False,
+                "sku": item.sku,
+                "shop_id": shop_id,
+                "created_at": now,
+                "updated_at": now
+            }
+            for item in items
+        ])
+
+        statement = statement.on_conflict_do_update(
+            index_elements=[Item.shop_id, Item.sku],
+            set_={
+                **{field: statement.excluded[field] for field in provided},
+                "updated_at": now
+            }
+        ).returning(literal_column("xmax = 0").label("inserted"))
+
+        result = await db.execute(statement)
+        inserted = result.scalars().all()
+
+        created += sum(1 for flag in inserted if flag)
+        updated += sum(1 for flag in inserted if not flag)
+
+    # invalidates cached catalogs of this shop
+    await db.execute(
+        update(Shop)
+        .where(Shop.id == shop_id)
+        .values(catalog_version=Shop.catalog_version + 1)
+    )
+
+    await db.commit()
+
+    return created, updated
+
+
+# Bulk create or update items by SKU (shop_owner only, must own the shop).
+# Accepts a JSON array, NDJSON or CSV with a header row. CSV and NDJSON are
+# read as they stream in and written every ITEM_IMPORT_CHUNK_SIZE rows, one
+# upsert and commit per chunk, so memory and transactions stay bounded for
+# any upload size. Valid rows are imported even when others fail, failed
+# rows are reported by their position in the upload.
+@router.post("/{shop_id}/import", response_model=ItemImportResponse)
+async def import_items(
+    shop_id: int,
+    request: Request,
+    current_user = Depends(require_shop_owner),
+    db: AsyncSession = Depends(get_db)
+):
+    # 1. Verify shop ownership, once for the whole upload
+    result = await db.execute(select(Shop.owner_id).where(Shop.id == shop_id))
+    owner_id = result.scalar_one_or_none()
+
+    if owner_id is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Shop not found"
+        )
+
+    if owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail= "You are not the owner of this shop"
+        )
+
+    # don't hold a connection while the upload streams in
+    await db.close()
+
+    rows = iter_import_rows(request)
+
+    report = {"received": 0, "created": 0, "updated": 0, "failed": 0, "errors": [], "truncated": False}
+
+    def fail(row: int, sku: Optional[str], message: str):
+        report["failed"] += 1
+
+        if len(report["errors"]) < settings.ITEM_IMPORT_MAX_ERRORS:
+            report["errors"].append({"row": row, "sku": sku, "message": message})
+
+    # sku -> (row, item), a later row for the same sku replaces an earlier one
+    chunk: dict[str, tuple[int, ItemImportRow]] = {}
+
+    async def upsert(rows) -> bool:
+        try:
+            created, updated = await _upsert_items(db, shop_id, rows)
+        except DBAPIError:
+            await db.rollback()
+            return False
+
+        report["created"] += created
+        report["updated"] += updated
+        return True
+
+    # a row the database rejects fails its whole chunk, then retry the chunk
+    # row by row to find the culprits and keep the rest
+    async def flush():
+        if await upsert(list(chunk.values())):
+            return
+
+        for row, item in chunk.values():
+            if not await upsert([(row, item)]):
+                fail(row, item.sku, "Rejected by the database")
+
+    # 2. Validate rows as they arrive, upsert them chunk by chunk
+    last_row = 0
+
+    try:
+        async for row, data, error in rows:
+            last_row = row
+
+            if report["received"] >= settings.ITEM_IMPORT_MAX_ROWS:
+                fail(row, None, f"Imports are limited to {settings.ITEM_IMPORT_MAX_ROWS} rows, the rest was skipped")
+                report["truncated"] = True
+                break
+
+            report["received"] += 1
+
+            if error:
+                fail(row, None, error)
+                continue
+
+            try:
+                item = ItemImportRow.model_validate(data)
+            except ValidationError as exc:
+                sku = data.get("sku")
+                fail(row, sku if isinstance(sku, str) else None, _validation_message(exc))
+                continue
+
+            chunk[item.sku] = (row, item)
+
+            if len(chunk) >= settings.ITEM_IMPORT_CHUNK_SIZE:
+                await flush()
+                chunk.clear()
+
+    # the rows before it are kept, the report tells the client where it stopped
+    except ImportTruncated as exc:
+        fail(last_row + 1, None, f"{exc}, the rest of the upload was skipped")
+        report["truncated"] = True
+
+    if chunk:
+        await flush()
 
+    return report
@@ -0,0 +1,165 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketException, status
+from fastapi.responses import StreamingResponse
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.models.shop import Shop
+from app.core.config import settings
+from app.core.database import get_db, async_session_maker
+from app.core.jwt import decode_access_token
+from app.auth.dependencies import get_current_user
+from app.utils.order_events import order_events, OrderEventsBusy, RESYNC, user_channel, shop_channel
+
+
+router = APIRouter(prefix="/orders", tags=["Order events"])
+
+
+# Channels to listen on: the user's own orders, or a shop's orders when
+# shop_id is given. None if the user doesn't own that shop.
+async def _channels(db: AsyncSession, user_id: int, shop_id: Optional[int]) -> Optional[set[str]]:
+    if shop_id is None:
+        return {user_channel(user_id)}
+
+    result = await db.execute(
+        select(Shop.id).where(Shop.id == shop_id, Shop.owner_id == user_id)
+    )
+
+    if result.scalar_one_or_none() is None:
+        return None
+
+    return {shop_channel(shop_id)}
+
+
+def _check_capacity():
+    if order_events.full():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many live connections, try again later",
+            headers={"Retry-After": "5"}
+        )
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+# GET live order events as Server-Sent Events, instead of polling the order
+# endpoints. Without shop_id: status changes of the user's own orders; with
+# shop_id (Shop Owner Only): new orders and status changes of that shop.
+#
+# A "resync" event means events may have been missed, the client should
+# refetch. The stream ends after a resync caused by the client falling behind.
+@router.get("/events")
+async def stream_order_events(
+    shop_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    channels = await _channels(db, current_user.id, shop_id)
+
+    if channels is None:
+        raise HTTPException(
+            status_code=403,
+            detail= "You are not the owner of this shop"
+        )
+
+    # the stream can stay open for hours, don't hold a pooled connection
+    await db.close()
+
+    _check_capacity()
+
+    # subscribe once the body is iterated, a response that is never sent
+    # (client gone, error in between) then leaves nothing behind
+    async def stream():
+        try:
+            subscription = order_events.subscribe(channels)
+        except OrderEventsBusy:
+            # filled up since the check, the client reconnects and refetches
+            yield _sse(RESYNC)
+            return
+
+        try:
+            yield ": connected\n\n"
+
+            while True:
+                event = await subscription.get(timeout=settings.ORDER_EVENTS_KEEPALIVE_SECONDS)
+
+                if event is None:
+                    # comment line, keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield _sse(event)
+
+                if event is RESYNC and subscription.closed:
+                    return
+        finally:
+            order_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _wait_disconnect(websocket: WebSocket):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+# Same events over a WebSocket, one JSON message per event. Browsers can't
+# set headers on a WebSocket, so the access token comes as ?token=.
+@router.websocket("/events/ws")
+async def order_events_websocket(
+    websocket: WebSocket,
+    token: str,
+    shop_id: Optional[int] = None
+):
+    try:
+        user_id = decode_access_token(token).get("user_id")
+    except JWTError:
+        user_id = None
+
+    if user_id is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid authentication")
+
+    async with async_session_maker() as db:
+        channels = await _channels(db, user_id, shop_id)
+
+    if channels is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="You are not the owner of this shop")
+
+    try:
+        subscription = order_events.subscribe(channels)
+    except OrderEventsBusy:
+        raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many live connections")
+
+    try:
+        await websocket.accept()
+        disconnected = asyncio.create_task(_wait_disconnect(websocket))
+
+        try:
+            while True:
+                next_event = asyncio.create_task(subscription.get())
+                await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+
+                if disconnected.done():
+                    next_event.cancel()
+                    return
+
+                event = next_event.result()
+                await websocket.send_json(event)
+
+                if event is RESYNC and subscription.closed:
+                    await websocket.close()
+                    return
+        finally:
+            disconnected.cancel()
+    finally:
+        order_events.unsubscribe(subscription)
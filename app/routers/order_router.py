@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, insert, values, column, literal, tuple_, func, true, case, text
+from sqlalchemy import Integer, Numeric, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import selectinload, joinedload
 from decimal import Decimal
 from datetime import datetime, timezone
 
@@ -9,24 +13,244 @@ from app.models.order import Order
 from app.models.order_item import OrderItem
 from app.models.item import Item
 from app.models.shop import Shop
+from app.models.user import User
 from app.models.enums import ItemStatus
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, read_session_maker
+from app.core.config import settings
+from app.core.responses import model_response
+from app.schemas.common import CursorPage
 from app.schemas.order import OrderCreate, OrderDetailResponse, OrderCancelRequest, ItemStatusEnum
-from app.schemas.order import OrderStatusUpdate
+from app.schemas.order import OrderSummaryResponse
+from app.schemas.item import ItemResponse
+from app.schemas.enums import OrderViewEnum, ExportFormatEnum
+from app.schemas.order import OrderStatusUpdate, OrderBulkStatusUpdate, OrderBulkStatusResponse
 from app.auth.dependencies import get_current_user
-from app.utils.resend_email_service import send_order_ready_email, send_order_picked_email
+from app.utils.resend_email_service import order_ready_email, order_picked_email
+from app.utils.email_outbox import enqueue_email, enqueue_emails, email_dispatcher
+from app.utils.pagination import decode_created_at_cursor, build_page
+from app.utils.order_export import csv_chunk, csv_header, ndjson_chunk
+from app.utils.sales_rollup import record_order_placed, record_order_cancelled
+from app.utils.order_events import order_events, order_event
+from app.utils.idempotency import request_hash, claim_idempotency_key, replay_response, save_idempotent_response
 
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+
+# Summary projection: plain order columns plus item count and names, built in
+# one statement. The LATERAL aggregate runs per returned row, so a LIMIT on the
+# outer query bounds the work to the page size.
+def _order_summary_query():
+    order_items = (
+        select(
+            func.count(OrderItem.id).label("item_count"),
+            func.coalesce(
+                func.array_agg(aggregate_order_by(Item.name, OrderItem.id)),
+                []
+            ).label("item_names")
+        )
+        .join(Item, Item.id == OrderItem.item_id)
+        .where(OrderItem.order_id == Order.id)
+        .lateral("order_item_agg")
+    )
+
+    return (
+        select(
+            Order.id,
+            Order.user_id,
+            Order.shop_id,
+            Order.total_amount,
+            Order.status,
+            Order.delivery_address,
+            Order.notes,
+            Order.created_at,
+            Order.updated_at,
+            order_items.c.item_count,
+            order_items.c.item_names
+        )
+        .select_from(Order)
+        .join(order_items, true())
+    )
+
+
+# Reserve stock for every line in one conditional UPDATE. A row is only
+# decremented while the item is available and has enough stock left, so fewer
+# returned ids than lines means the cart can't be fulfilled.
+def _reserve_stock_cte(shop_id: int, quantities: dict[int, int], now: datetime):
+    qty = case(quantities, value=Item.id)
+
+    return (
+        update(Item)
+        .where(
+            Item.id.in_(quantities),
+            Item.shop_id == shop_id,
+            Item.is_available.is_(True),
+            Item.stock_quantity >= qty
+        )
+        .values(stock_quantity=Item.stock_quantity - qty, updated_at=now)
+        .returning(Item.id)
+        .cte("reserved")
+    )
+
+
+# Place an order in a single statement:
+#
+#   WITH reserved AS (UPDATE items ... RETURNING id),
+#        new_order AS (INSERT INTO orders SELECT ... WHERE every line reserved RETURNING id)
+#   INSERT INTO order_items SELECT new_order.id, lines.* FROM new_order, (VALUES ...) AS lines
+#   RETURNING id, item_id
+#
+# If any line can't be reserved no order row is produced and nothing is
+# returned, the caller then rolls back the partial stock update. The item row
+# locks taken by the UPDATE are held only until the commit that follows.
+def _place_order_statement(order_values: dict, lines: list[dict], quantities: dict[int, int], now: datetime):
+    reserved = _reserve_stock_cte(order_values["shop_id"], quantities, now)
+
+    order_columns = list(order_values)
+    new_order = (
+        insert(Order)
+        .from_select(
+            order_columns,
+            select(*[
+                literal(value, Order.__table__.c[name].type)
+                for name, value in order_values.items()
+            ]).where(
+                select(func.count()).select_from(reserved).scalar_subquery() == len(quantities)
+            )
+        )
+        .returning(Order.id)
+        .cte("new_order")
+    )
+
+    line_rows = (
+        values(
+            column("item_id", Integer),
+            column("quantity", Integer),
+            column("unit_price", Numeric(10, 2)),
+            column("subtotal", Numeric(10, 2)),
+            column("notes", Text),
+            name="lines"
+        )
+        .data([
+            (line["item_id"], line["quantity"], line["unit_price"], line["subtotal"], line["notes"])
+            for line in lines
+        ])
+    )
+
+    return (
+        insert(OrderItem)
+        .from_select(
+            ["order_id", "item_id", "quantity", "unit_price", "subtotal", "notes", "created_at"],
+            select(
+                new_order.c.id,
+                line_rows.c.item_id,
+                line_rows.c.quantity,
+                line_rows.c.unit_price,
+                line_rows.c.subtotal,
+                line_rows.c.notes,
+                literal(now, OrderItem.created_at.type)
+            )
+            .select_from(new_order)
+            .join(line_rows, true())
+        )
+        .returning(OrderItem.id, OrderItem.order_id, OrderItem.item_id)
+        .add_cte(reserved, new_order)
+    )
+
+
+# Put the stock of cancelled orders back, quantities are summed per item in
+# the database so nothing has to be loaded first
+async def _release_order_stock(db: AsyncSession, order_ids: list[int]):
+    released = (
+        select(OrderItem.item_id, func.sum(OrderItem.quantity).label("quantity"))
+        .where(OrderItem.order_id.in_(order_ids))
+        .group_by(OrderItem.item_id)
+        .subquery()
+    )
+
+    await db.execute(
+        update(Item)
+        .where(Item.id == released.c.item_id)
+        .values(stock_quantity=Item.stock_quantity + released.c.quantity)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Orders with everything OrderDetailResponse needs, in two queries however
+# many orders match: the orders with their user and shop joined, then every
+# line with its item
+def _order_details_query():
+    return (
+        select(Order)
+        .options(
+            joinedload(Order.user),
+            joinedload(Order.shop),
+            selectinload(Order.order_items).joinedload(OrderItem.item)
+        )
+    )
+
+
+def _order_detail_query(order_id: int):
+    return _order_details_query().where(Order.id == order_id)
+
+
+# order data for the READY / PICKED email templates,
+# lines are (item name, quantity, subtotal)
+def _email_payload(order_id: int, shop_name: str, total_amount, delivery_address, lines) -> dict:
+    return {
+        "id": order_id,
+        "shop_name": shop_name,
+        "total_amount": str(total_amount),
+        "delivery_address": delivery_address,
+        "items": [
+            {
+                "name": name,
+                "quantity": quantity,
+                "subtotal": str(subtotal)
+            }
+            for name, quantity, subtotal in lines
+        ]
+    }
+
+
+EMAIL_TEMPLATES = {
+    ItemStatusEnum.READY: order_ready_email,
+    ItemStatusEnum.PICKED: order_picked_email
+}
+
+
+def _line_quantities(lines) -> dict[int, int]:
+    quantities = {}
+    for line in lines:
+        quantities[line.item_id] = quantities.get(line.item_id, 0) + line.quantity
+    return quantities
+
+
 # POST Create Order by user
+#
+# Two round trips: one SELECT for the items (and their shop), one statement
+# that reserves stock and inserts the order with its lines. The response is
+# built from data already in memory instead of reading the order back.
 @router.post("/create", response_model=OrderDetailResponse)
 async def create_order(
     data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255),
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    # 1. Fetch All Items in Order
+    # 0. With an Idempotency-Key, claim it first. A retry of a request that
+    # already succeeded gets the stored response, no items are looked up and
+    # nothing is inserted. Failed requests roll the claim back with them.
+    key_id = None
+
+    if idempotency_key:
+        body_hash = request_hash(data.model_dump_json())
+        key_id = await claim_idempotency_key(db, current_user.id, idempotency_key, body_hash)
+
+        if key_id is None:
+            return await replay_response(db, current_user.id, idempotency_key, body_hash)
+
+    # 1. Fetch All Items in Order, with the shop for the response
     item_ids = [i.item_id for i in data.items]
 
     query = (
@@ -35,6 +259,7 @@ async def create_order(
             Item.id.in_(item_ids),
             Item.shop_id == data.shop_id
         )
+        .options(joinedload(Item.shop))
     )
 
     result = await db.execute(query)
@@ -48,9 +273,24 @@ async def create_order(
             detail="Some items are invalid or do not belong to the selected shop"
         )
     
+    if any(not item.is_available for item in items):
+        raise HTTPException(
+            status_code=400,
+            detail="Some items are currently unavailable"
+        )
+
     # Create a map for quick access
     item_map = {item.id: item for item in items}
 
+    # Fail fast on a stale cart, the reservation below is the real check
+    quantities = _line_quantities(data.items)
+
+    if any((item_map[item_id].stock_quantity or 0) < qty for item_id, qty in quantities.items()):
+        raise HTTPException(
+            status_code=409,
+            detail="Insufficient stock for one or more items"
+        )
+
 
     # 2. Calculate Total Amount
     total_amount = Decimal("0.00")
@@ -72,206 +312,468 @@ async def create_order(
             "notes": input_item.notes
         })
 
-    # 3. Create Order
+    # 3. Reserve stock and create the order with its items
+    now = datetime.now(timezone.utc)
+
+    order_values = {
+        "user_id": current_user.id,
+        "shop_id": data.shop_id,
+        "total_amount": total_amount,
+        "status": ItemStatus.PENDING,
+        "delivery_address": data.delivery_address,
+        "notes": data.notes,
+        "created_at": now,
+        "updated_at": now
+    }
 
-    order = Order(
-        user_id = current_user.id,
-        shop_id = data.shop_id,
-        delivery_address = data.delivery_address,
-        notes = data.notes,
-        total_amount = total_amount
+    result = await db.execute(
+        _place_order_statement(order_values, order_items_data, quantities, now)
     )
+    inserted = result.all()
+
+    if not inserted:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Insufficient stock for one or more items"
+        )
 
-    db.add(order)
+    # 4. Build the response from what we already have
+    order_id = inserted[0].order_id
+    order_item_ids = {row.item_id: row.id for row in inserted}
 
-    await db.flush()     # we get order.id here
+    items_response = {}
+    for item_id, qty in quantities.items():
+        item_response = ItemResponse.model_validate(item_map[item_id])
+        items_response[item_id] = item_response.model_copy(update={
+            "stock_quantity": item_response.stock_quantity - qty,
+            "updated_at": now
+        })
 
-    # 4. Create Order Items
-    for oi in order_items_data:
-        db.add(OrderItem(order_id=order.id, **oi))
+    response = OrderDetailResponse.model_validate({
+        **order_values,
+        "id": order_id,
+        "user": current_user,
+        "shop": items[0].shop,
+        "order_items": [
+            {
+                **oi,
+                "id": order_item_ids[oi["item_id"]],
+                "order_id": order_id,
+                "created_at": now,
+                "item": items_response[oi["item_id"]]
+            }
+            for oi in order_items_data
+        ]
+    }, from_attributes=True)
+
+    # stored with the order, a retry with the same key replays it
+    if key_id is not None:
+        await save_idempotent_response(db, key_id, order_id, 200, response.model_dump(mode="json"))
+
+    # Count the sale in the daily rollups, last so the rollup rows are locked
+    # only until the commit right after
+    await record_order_placed(
+        db,
+        data.shop_id,
+        now,
+        total_amount,
+        [(line["item_id"], line["quantity"], line["subtotal"]) for line in order_items_data]
+    )
 
     # Save everything
     await db.commit()
 
-    query = (
-        select(Order)
-        .where(Order.id == order.id)
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.shop),
-            selectinload(Order.order_items).selectinload(OrderItem.item)
-        )
-    )
+    await order_events.publish([
+        order_event("order.created", order_id, current_user.id, data.shop_id, ItemStatus.PENDING, now)
+    ])
+
+    return model_response(OrderDetailResponse, response)
+
+
+# One page of orders newest first. Keyset pagination on (created_at, id), so
+# page 500 costs the same as page 1.
+async def _order_page(db: AsyncSession, query, view: OrderViewEnum, status, cursor: Optional[str], limit: int):
+    query = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
+    if status:
+        query = query.where(Order.status == status)
+
+    # continue strictly after the last (created_at, id) of the previous page
+    if cursor:
+        created_at, order_id = decode_created_at_cursor(cursor)
+        query = query.where(tuple_(Order.created_at, Order.id) < (created_at, order_id))
 
     result = await db.execute(query)
-    full_order = result.scalars().first()
 
-    return full_order
+    if view == OrderViewEnum.SUMMARY:
+        orders = result.all()
+        schema = CursorPage[OrderSummaryResponse]
+    else:
+        orders = result.scalars().all()
+        schema = CursorPage[OrderDetailResponse]
+
+    return model_response(schema, build_page(orders, limit, lambda o: (o.created_at, o.id)))
+
+
+# GET the current user's own orders, newest first with keyset pagination.
+#
+# The detail view is two queries per page whatever its size: the orders with
+# their user and shop joined, then every line of the page with its item.
+@router.get(
+    "/me",
+    response_model=Union[CursorPage[OrderDetailResponse], CursorPage[OrderSummaryResponse]]
+)
+async def get_my_orders(
+    status: Optional[ItemStatusEnum] = None,
+    view: OrderViewEnum = OrderViewEnum.DETAIL,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    if view == OrderViewEnum.SUMMARY:
+        query = _order_summary_query()
+    else:
+        query = _order_details_query()
+
+    # served by idx_user_created_at, idx_user_status with a status filter
+    query = query.where(Order.user_id == current_user.id)
+
+    return await _order_page(db, query, view, status, cursor, limit)
 
 
-# GET Shop Orders (Shop Owner Only)
-@router.get("/shop/{shop_id}", response_model=list[OrderDetailResponse])
+# GET Shop Orders (Shop Owner Only), newest first with keyset pagination.
+# The ownership check, then the same two queries per page as /me.
+@router.get(
+    "/shop/{shop_id}",
+    response_model=Union[CursorPage[OrderDetailResponse], CursorPage[OrderSummaryResponse]]
+)
 async def get_shop_orders(
     shop_id: int,
-    db: AsyncSession = Depends(get_db),
+    status: Optional[ItemStatusEnum] = None,
+    view: OrderViewEnum = OrderViewEnum.DETAIL,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
     # check if shop belongs to current owner
     result = await db.execute(
-        select(Shop).where(Shop.id == shop_id, Shop.owner_id == current_user.id)
+        select(Shop.id).where(Shop.id == shop_id, Shop.owner_id == current_user.id)
     )
 
-    shop = result.scalars().first()
-
-    if not shop:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=403,
             detail= "You are not the owner of this shop"
         )
     
+    if view == OrderViewEnum.SUMMARY:
+        query = _order_summary_query()
+    else:
+        query = _order_details_query()
+
+    # served by idx_shop_created_at, idx_shop_status with a status filter
+    query = query.where(Order.shop_id == shop_id)
+
+    return await _order_page(db, query, view, status, cursor, limit)
+
+
+# Flat export query, one row per order line in EXPORT_COLUMNS order. Oldest
+# first so the export reads like a ledger, served by idx_shop_created_at.
+def _order_export_query(shop_id: int, created_from, created_to, status):
     query = (
-        select(Order)
-        .where(Order.shop_id == shop_id)
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.shop),
-            selectinload(Order.order_items).selectinload(OrderItem.item)
+        select(
+            Order.id,
+            Order.created_at,
+            Order.status,
+            Order.user_id,
+            User.email,
+            Order.delivery_address,
+            Order.notes,
+            Order.total_amount,
+            Order.cancelled_at,
+            OrderItem.id,
+            OrderItem.item_id,
+            Item.sku,
+            Item.name,
+            OrderItem.quantity,
+            OrderItem.unit_price,
+            OrderItem.subtotal,
+            OrderItem.notes
         )
-        .order_by(Order.created_at.desc())
+        .join(User, User.id == Order.user_id)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Item, Item.id == OrderItem.item_id)
+        .where(Order.shop_id == shop_id)
+        .order_by(Order.created_at, Order.id, OrderItem.id)
     )
 
-    result = await db.execute(query)
+    if created_from:
+        query = query.where(Order.created_at >= created_from)
 
-    return result.scalars().unique().all()
+    if created_to:
+        query = query.where(Order.created_at < created_to)
 
+    if status:
+        query = query.where(Order.status == status)
 
-# Update Order Status (Shop Owner Only) and send email when status is ready and picked
-@router.patch("/{order_id}/status", response_model=OrderDetailResponse)
-async def update_order_status(
-    order_id: int,
-    data: OrderStatusUpdate,
-    db: AsyncSession = Depends(get_db),
+    return query
+
+
+# Export a shop's order history (Shop Owner Only) as NDJSON or CSV, one row
+# per order line. Rows come from a server side cursor ORDER_EXPORT_CHUNK_ROWS
+# at a time and are written out chunk by chunk, so memory doesn't grow with
+# the number of orders. created_to is exclusive.
+@router.get("/shop/{shop_id}/export")
+async def export_shop_orders(
+    shop_id: int,
+    format: ExportFormatEnum = ExportFormatEnum.NDJSON,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[ItemStatusEnum] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    # 1. Fetch order with shop relation
-    query = (
-        select(Order)
-        .where(Order.id == order_id)
-        .options(selectinload(Order.shop))
+    # 1. check if shop belongs to current owner
+    result = await db.execute(
+        select(Shop.id).where(Shop.id == shop_id, Shop.owner_id == current_user.id)
     )
-    result = await db.execute(query)
 
-    order = result.scalars().first()
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=403,
+            detail= "You are not the owner of this shop"
+        )
 
-    if not order:
+    if created_from and created_to and created_from >= created_to:
         raise HTTPException(
-            status_code=404,
-            detail= "Order not found"
+            status_code=400,
+            detail="created_from must be before created_to"
         )
-    
-    # 2. Check owner permissions
-    if order.shop.owner_id != current_user.id:
+
+    query = _order_export_query(shop_id, created_from, created_to, status)
+    to_chunk = csv_chunk if format == ExportFormatEnum.CSV else ndjson_chunk
+
+    # 2. the response outlives the request's session, so the stream opens its own
+    async def rows():
+        if format == ExportFormatEnum.CSV:
+            yield csv_header()
+
+        async with read_session_maker() as session:
+            # one long running cursor, not a slow statement
+            if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+                await session.execute(text("SET LOCAL statement_timeout = 0"))
+
+            result = await session.stream(
+                query.execution_options(yield_per=settings.ORDER_EXPORT_CHUNK_ROWS)
+            )
+
+            async for partition in result.partitions():
+                yield to_chunk(partition)
+
+    if format == ExportFormatEnum.CSV:
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="shop-{shop_id}-orders.{extension}"'}
+    )
+
+
+# Bulk Update Order Status (Shop Owner Only), e.g. marking a whole pickup
+# window READY at once. The number of statements and outbound email calls
+# doesn't grow with the number of orders: one UPDATE for all orders, one
+# query for their lines, one INSERT for the outbox and batched delivery.
+@router.patch("/shop/{shop_id}/status", response_model=OrderBulkStatusResponse)
+async def bulk_update_order_status(
+    shop_id: int,
+    data: OrderBulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    # cancellations release stock per order, they go through the single endpoints
+    if data.status == ItemStatusEnum.CANCELLED:
+        raise HTTPException(
+            status_code=400,
+            detail="Orders must be cancelled one at a time"
+        )
+
+    # 1. Verify shop ownership
+    result = await db.execute(
+        select(Shop.name).where(Shop.id == shop_id, Shop.owner_id == current_user.id)
+    )
+    shop_name = result.scalar_one_or_none()
+
+    if shop_name is None:
         raise HTTPException(
             status_code=403,
             detail= "You are not the owner of this shop"
         )
-    
-    # 3. Update status
-    order.status = data.status
 
-    await db.commit()
+    order_ids = list(dict.fromkeys(data.order_ids))
+    now = datetime.now(timezone.utc)
 
-    # SEND EMAIL IF STATUS = READY
-    if data.status.value.lower() == "ready":
-        # Fetch full order details for email
-        email_query = (
-            select(Order)
-            .where(Order.id == order.id)
-            .options(
-                selectinload(Order.user),
-                selectinload(Order.shop),
-                selectinload(Order.order_items).selectinload(OrderItem.item)
-            )
+    # 2. Update every order of this shop that isn't cancelled or already in
+    # the target status, joined to users for the email address
+    result = await db.execute(
+        update(Order)
+        .where(
+            Order.id.in_(order_ids),
+            Order.shop_id == shop_id,
+            Order.status != ItemStatus.CANCELLED,
+            Order.status != data.status,
+            Order.user_id == User.id
         )
+        .values(status=data.status, updated_at=now)
+        .returning(Order.id, Order.user_id, Order.total_amount, Order.delivery_address, User.email)
+        .execution_options(synchronize_session=False)
+    )
+    updated = {row.id: row for row in result.all()}
 
-        email_result = await db.execute(email_query)
-        order_full = email_result.scalars().first()
-
-        # Prepare email data
-        email_payload = {
-            "id": order_full.id,
-            "shop_name": order_full.shop.name,
-            "total_amount": str(order_full.total_amount),
-            "delivery_address": order_full.delivery_address,
-            "items": [
-                {
-                    "name": oi.item.name,
-                    "quantity": oi.quantity,
-                    "subtotal": str(oi.subtotal)
-                }
-                for oi in order_full.order_items
-            ]
-        }
-
-        # Send email to user
-        await send_order_ready_email(
-            to_email=order_full.user.email,
-            order=email_payload
+    # 3. Queue the emails, item lines for all orders in one query
+    email_template = EMAIL_TEMPLATES.get(data.status)
+
+    if email_template and updated:
+        result = await db.execute(
+            select(OrderItem.order_id, Item.name, OrderItem.quantity, OrderItem.subtotal)
+            .join(Item, Item.id == OrderItem.item_id)
+            .where(OrderItem.order_id.in_(updated))
+            .order_by(OrderItem.order_id, OrderItem.id)
         )
-    
 
-    # SEND EMAIL IF STATUS = PICKED
-    if data.status.value.lower() == "picked":
-        # Fetch full order details for email
-        email_query = (
-            select(Order)
-            .where(Order.id == order.id)
-            .options(
-                selectinload(Order.user),
-                selectinload(Order.shop),
-                selectinload(Order.order_items).selectinload(OrderItem.item)
+        lines = {}
+        for line in result.all():
+            lines.setdefault(line.order_id, []).append((line.name, line.quantity, line.subtotal))
+
+        await enqueue_emails(db, [
+            email_template(
+                to_email=order.email,
+                order=_email_payload(order.id, shop_name, order.total_amount, order.delivery_address, lines.get(order.id, []))
             )
+            for order in updated.values()
+        ])
+
+    await db.commit()
+
+    if email_template and updated:
+        email_dispatcher.notify()
+
+    await order_events.publish([
+        order_event("order.status_changed", order.id, order.user_id, shop_id, data.status, now)
+        for order in updated.values()
+    ])
+
+    return {
+        "status": data.status,
+        "updated": [order_id for order_id in order_ids if order_id in updated],
+        "skipped": [order_id for order_id in order_ids if order_id not in updated]
+    }
+
+
+# Update Order Status (Shop Owner Only) and send email when status is ready and picked
+#
+# The ownership check and the status change are one UPDATE ... FROM shops,
+# the order graph is then loaded once and used for the email and the response.
+@router.patch("/{order_id}/status", response_model=OrderDetailResponse)
+async def update_order_status(
+    order_id: int,
+    data: OrderStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    now = datetime.now(timezone.utc)
+
+    values = {"status": data.status, "updated_at": now}
+    if data.status == ItemStatusEnum.CANCELLED:
+        values["cancelled_at"] = now
+
+    # 1. Update status, only for the shop owner and never on a cancelled order
+    result = await db.execute(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.shop_id == Shop.id,
+            Shop.owner_id == current_user.id,
+            Order.status != ItemStatus.CANCELLED
         )
+        .values(**values)
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )
 
-        email_result = await db.execute(email_query)
-        order_full = email_result.scalars().first()
-
-        # Prepare email data
-        email_payload = {
-            "id": order_full.id,
-            "shop_name": order_full.shop.name,
-            "total_amount": str(order_full.total_amount),
-            "delivery_address": order_full.delivery_address,
-            "items": [
-                {
-                    "name": oi.item.name,
-                    "quantity": oi.quantity,
-                    "subtotal": str(oi.subtotal)
-                }
-                for oi in order_full.order_items
-            ]
-        }
-
-        # Send email to user
-        await send_order_picked_email(
-            to_email=order_full.user.email,
-            order=email_payload
+    if result.scalar_one_or_none() is None:
+        # nothing updated, find out why
+        result = await db.execute(
+            select(Shop.owner_id)
+            .join(Order, Order.shop_id == Shop.id)
+            .where(Order.id == order_id)
         )
+        owner_id = result.scalar_one_or_none()
 
+        if owner_id is None:
+            raise HTTPException(
+                status_code=404,
+                detail= "Order not found"
+            )
 
+        if owner_id != current_user.id:
+            raise HTTPException(
+                status_code=403,
+                detail= "You are not the owner of this shop"
+            )
 
-    # 4. Fetch full order with relationships for response
-    full_result = await db.execute(
-        select(Order)
-        .where(Order.id == order.id)
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.shop),
-            selectinload(Order.order_items).selectinload(OrderItem.item)
+        raise HTTPException(
+            status_code=400,
+            detail= "Order already cancelled"
         )
-    )
 
-    return full_result.scalars().first()
+    # 2. A cancellation gives the reserved stock back
+    if data.status == ItemStatusEnum.CANCELLED:
+        await _release_order_stock(db, [order_id])
+
+    # 3. Fetch full order once, for the email and the response
+    result = await db.execute(_order_detail_query(order_id))
+    order = result.scalars().one()
+
+    if data.status == ItemStatusEnum.CANCELLED:
+        await record_order_cancelled(
+            db,
+            order.shop_id,
+            order.created_at,
+            order.total_amount,
+            [(oi.item_id, oi.quantity, oi.subtotal) for oi in order.order_items]
+        )
+
+    # QUEUE EMAIL IF STATUS = READY OR PICKED, in the same transaction as the
+    # status change. Delivery happens in the background dispatcher.
+    email_template = EMAIL_TEMPLATES.get(data.status)
+
+    if email_template:
+        email_payload = _email_payload(
+            order.id,
+            order.shop.name,
+            order.total_amount,
+            order.delivery_address,
+            [(oi.item.name, oi.quantity, oi.subtotal) for oi in order.order_items]
+        )
+
+        enqueue_email(db, email_template(to_email=order.user.email, order=email_payload))
+
+    await db.commit()
+
+    if email_template:
+        email_dispatcher.notify()
+
+    await order_events.publish([
+        order_event("order.status_changed", order.id, order.user_id, order.shop_id, data.status, now)
+    ])
+
+    return model_response(OrderDetailResponse, order)
 
 
 # Cancel order 
@@ -282,53 +784,69 @@ async def cancel_order(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    print("Begin Enpoint")
-    # 1. Fetch order
-    query = (
-        select(Order)
+    now = datetime.now(timezone.utc)
+
+    # 1. Cancel order, only if it is still pending. The conditional UPDATE
+    # makes concurrent cancels (or a racing status change) release stock once.
+    result = await db.execute(
+        update(Order)
         .where(
             Order.id == order_id,
-            Order.user_id == current_user.id
+            Order.user_id == current_user.id,
+            Order.status == ItemStatus.PENDING
         )
-        .options(
-            selectinload(Order.order_items).selectinload(OrderItem.item),
-            selectinload(Order.shop)
+        .values(
+            status=ItemStatus.CANCELLED,
+            cancelled_at=now,
+            cancel_reason=data.cancel_reason,
+            updated_at=now
         )
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
     )
 
-    result = await db.execute(query)
-    order = result.scalars().first()
+    if result.scalar_one_or_none() is None:
+        # 2. Validate cancellation rules
+        result = await db.execute(
+            select(Order.status).where(Order.id == order_id, Order.user_id == current_user.id)
+        )
+        status = result.scalar_one_or_none()
 
-    print("Order fetched", order)
+        if status is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Order not found"
+            )
+
+        if status == ItemStatus.CANCELLED:
+            raise HTTPException(
+                status_code=400,
+                detail= "Order already cancelled"
+            )
 
-    if not order:
-        raise HTTPException(
-            status_code=404,
-            detail="Order not found"
-        )
-    
-    # 2. Validate cancellation rules
-    if order.status == "cancelled":
-        raise HTTPException(
-            status_code=400,
-            detail= "Order already cancelled"
-        )
-    
-    if order.status != "pending":
         raise HTTPException(
             status_code=400,
-            detail= f"Order cannot be cancelled when status is '{order.status}'"
+            detail= f"Order cannot be cancelled when status is '{status.value}'"
         )
-    
-    # 3. Cancel order
-    order.status = ItemStatusEnum.CANCELLED
 
-    order.cancelled_at = datetime.now(timezone.utc)
-    order.cancel_reason = data.cancel_reason
+    # 3. Release reserved stock
+    await _release_order_stock(db, [order_id])
 
-    await db.commit()
-    await db.refresh(order)
+    result = await db.execute(_order_detail_query(order_id))
+    order = result.scalars().one()
 
-    return order
+    await record_order_cancelled(
+        db,
+        order.shop_id,
+        order.created_at,
+        order.total_amount,
+        [(oi.item_id, oi.quantity, oi.subtotal) for oi in order.order_items]
+    )
+
+    await db.commit()
 
+    await order_events.publish([
+        order_event("order.status_changed", order.id, order.user_id, order.shop_id, ItemStatus.CANCELLED, now)
+    ])
 
+    return model_response(OrderDetailResponse, order)
@@ -0,0 +1,107 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_
+from app.core.config import settings
+from app.core.responses import model_response
+from app.core.database import get_read_db
+from app.models.item import Item
+from app.models.shop import Shop
+from app.routers.shop_router import SHOP_COLUMNS
+from app.schemas.common import CursorPage
+from app.schemas.search import ItemSearchResult, ShopSearchResult
+from app.utils.pagination import build_page, decode_rank_cursor
+from app.utils.search import search_backend, search_terms, ITEM_SEARCH, SHOP_SEARCH
+
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+# only the columns of ItemResponse
+ITEM_COLUMNS = (
+    Item.id,
+    Item.shop_id,
+    Item.name,
+    Item.sku,
+    Item.description,
+    Item.price,
+    Item.is_available,
+    Item.category,
+    Item.stock_quantity,
+    Item.created_at,
+    Item.updated_at
+)
+
+
+def _terms_or_400(q: str) -> list[str]:
+    terms = search_terms(q)
+
+    if not terms:
+        raise HTTPException(
+            status_code=400,
+            detail="Search query has no searchable words"
+        )
+
+    return terms
+
+
+# best matches first, then continue strictly after the (rank, id) of the
+# last row of the previous page
+def _ranked(query, rank, id_column, cursor: Optional[str], limit: int):
+    query = query.order_by(rank.desc(), id_column.desc()).limit(limit + 1)
+
+    if cursor:
+        last_rank, last_id = decode_rank_cursor(cursor)
+        query = query.where(tuple_(rank, id_column) < (last_rank, last_id))
+
+    return query
+
+
+# Search items by name, category and description, optionally in one shop
+@router.get("/items", response_model=CursorPage[ItemSearchResult])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    shop_id: Optional[int] = None,
+    is_available: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    condition, rank = search_backend.match(ITEM_SEARCH, _terms_or_400(q))
+    rank = rank.label("rank")
+
+    query = select(*ITEM_COLUMNS, rank).where(condition)
+
+    if shop_id is not None:
+        query = query.where(Item.shop_id == shop_id)
+
+    if is_available is not None:
+        query = query.where(Item.is_available == is_available)
+
+    result = await db.execute(_ranked(query, rank, Item.id, cursor, limit))
+    items = result.all()
+
+    return model_response(CursorPage[ItemSearchResult], build_page(items, limit, lambda i: (i.rank, i.id)))
+
+
+# Search shops by name and description
+@router.get("/shops", response_model=CursorPage[ShopSearchResult])
+async def search_shops(
+    q: str = Query(..., min_length=1, max_length=200),
+    is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    condition, rank = search_backend.match(SHOP_SEARCH, _terms_or_400(q))
+    rank = rank.label("rank")
+
+    query = select(*SHOP_COLUMNS, rank).where(condition)
+
+    if is_active is not None:
+        query = query.where(Shop.is_active == is_active)
+
+    result = await db.execute(_ranked(query, rank, Shop.id, cursor, limit))
+    shops = result.all()
+
+    return model_response(CursorPage[ShopSearchResult], build_page(shops, limit, lambda s: (s.rank, s.id)))
@@ -1,15 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.responses import model_response
+from app.core.database import get_db, get_read_db
 from app.models.shop import Shop
+from app.schemas.common import CursorPage
 from app.schemas.shop import ShopResponse, ShopCreate, ShopUpdate
 from app.auth.dependencies import require_shop_owner
+from app.utils.pagination import build_page, decode_id_cursor
 
 
 router = APIRouter(prefix="/shops", tags=["shops"])
 
 
+# only the columns of ShopResponse
+SHOP_COLUMNS = (
+    Shop.id,
+    Shop.owner_id,
+    Shop.name,
+    Shop.description,
+    Shop.address,
+    Shop.phone,
+    Shop.is_active,
+    Shop.created_at,
+    Shop.updated_at
+)
+
+
 # create shop owner only
 @router.post("/create", response_model=ShopResponse)
 async def create_shop(
@@ -36,7 +55,7 @@ async def create_shop(
 @router.get("/my-shop", response_model=list[ShopResponse])
 async def get_my_shops(
     current_user = Depends(require_shop_owner),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(
         select(Shop).where(Shop.owner_id == current_user.id)
@@ -44,17 +63,32 @@ async def get_my_shops(
 
     shops = result.scalars().all()
 
-    return shops
+    return model_response(list[ShopResponse], shops)
 
-# GET all shops
-@router.get("/all-shops")
+# GET all shops, oldest first, paginated by id
+@router.get("/all-shops", response_model=CursorPage[ShopResponse])
 async def get_all_shops(
-    db: AsyncSession = Depends(get_db)
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = Query(None, min_length=1, max_length=255),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(select(Shop))
-    shops = result.scalars().all()
+    query = select(*SHOP_COLUMNS).order_by(Shop.id).limit(limit + 1)
+
+    if is_active is not None:
+        query = query.where(Shop.is_active == is_active)
+
+    if name_prefix:
+        query = query.where(Shop.name.startswith(name_prefix, autoescape=True))
+
+    if cursor:
+        query = query.where(Shop.id > decode_id_cursor(cursor))
+
+    result = await db.execute(query)
+    shops = result.all()
 
-    return shops
+    return model_response(CursorPage[ShopResponse], build_page(shops, limit, lambda s: (s.id,)))
 
 
 
@@ -1,19 +1,60 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.responses import model_response
+from app.core.database import get_read_db
 from app.models import User
+from app.schemas.common import CursorPage
+from app.schemas.enums import UserTypeEnum
+from app.schemas.user import UserResponse
 from app.auth.dependencies import require_role
+from app.utils.pagination import build_page, decode_id_cursor
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.get("/")
+
+# only the columns of UserResponse, never hashed_password
+USER_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.user_type,
+    User.phone,
+    User.is_active,
+    User.created_at,
+    User.updated_at
+)
+
+
+# GET users, oldest first, paginated by id
+@router.get("/", response_model=CursorPage[UserResponse])
 async def get_all_users(
-    db: AsyncSession = Depends(get_db),
+    is_active: Optional[bool] = None,
+    user_type: Optional[UserTypeEnum] = None,
+    username_prefix: Optional[str] = Query(None, min_length=1, max_length=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
+    query = select(*USER_COLUMNS).order_by(User.id).limit(limit + 1)
+
+    # served by idx_user_type_active
+    if user_type:
+        query = query.where(User.user_type == user_type)
+
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+
+    if username_prefix:
+        query = query.where(User.username.startswith(username_prefix, autoescape=True))
 
-    return users
+    if cursor:
+        query = query.where(User.id > decode_id_cursor(cursor))
 
+    result = await db.execute(query)
+    users = result.all()
 
+    return model_response(CursorPage[UserResponse], build_page(users, limit, lambda u: (u.id,)))
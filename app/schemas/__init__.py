@@ -5,3 +5,6 @@ from .order import *
 from .common import *
 from .enums import *
 from .auth import *
+
+from .search import *
+from .analytics import *
\ No newline at end of file
@@ -0,0 +1,34 @@
+from datetime import date
+from typing import List
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+class TopItem(BaseModel):
+    item_id: int
+    name: str
+    quantity: int
+    revenue: Decimal
+
+
+# revenue and items_sold are net of cancellations, gross_revenue isn't
+class SalesFigures(BaseModel):
+    orders: int
+    cancelled_orders: int
+    cancellation_rate: float
+    gross_revenue: Decimal
+    revenue: Decimal
+    items_sold: int
+
+
+class ShopSalesDay(SalesFigures):
+    day: date
+    top_items: List[TopItem]
+
+
+class ShopSalesReport(BaseModel):
+    shop_id: int
+    date_from: date
+    date_to: date
+    totals: SalesFigures
+    days: List[ShopSalesDay]
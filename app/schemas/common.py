@@ -1,8 +1,15 @@
-from typing import List
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
 class PaginatedResponse(BaseModel):
     total: int
     page: int
     page_size: int
     items: List[dict]
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
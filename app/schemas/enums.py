@@ -10,3 +10,13 @@ class ItemStatusEnum(str, Enum):
     READY = "ready"
     PICKED = "picked"
     CANCELLED = "cancelled"
+
+
+class OrderViewEnum(str, Enum):
+    DETAIL = "detail"
+    SUMMARY = "summary"
+
+
+class ExportFormatEnum(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
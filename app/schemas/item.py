@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -8,8 +8,10 @@ from .shop import ShopResponse
 
 class ItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
+    sku: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = None
-    price: Decimal = Field(..., gt=0)
+    # Numeric(10, 2) in the database
+    price: Decimal = Field(..., gt=0, lt=10 ** 8)
     is_available: Optional[bool] = True
     category: Optional[str] = None
     stock_quantity: int = Field(default=0, ge=0)
@@ -20,10 +22,32 @@ class ItemCreate(ItemBase):
     pass
 
 
+# one row of a bulk import, the sku identifies the item to create or update
+class ItemImportRow(ItemBase):
+    sku: str = Field(..., min_length=1, max_length=100)
+
+
+class ItemImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    message: str
+
+
+class ItemImportResponse(BaseModel):
+    received: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ItemImportError]
+    # the upload was cut short (row limit, unreadable line), rows after that
+    # point were not imported
+    truncated: bool = False
+
+
 class ItemUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
-    price: Optional[Decimal] = Field(None, gt=0)
+    price: Optional[Decimal] = Field(None, gt=0, lt=10 ** 8)
     category: Optional[str] = None
     is_available: Optional[bool] = None
     stock_quantity: Optional[int] = Field(None, ge=0)
@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Optional, List
 from decimal import Decimal
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+
+from app.core.config import settings
 
 from .enums import ItemStatusEnum
 from .user import UserResponse
@@ -44,7 +46,31 @@ class OrderBase(BaseModel):
 
 class OrderCreate(OrderBase):
     shop_id: int
-    items: List[OrderItemCreate] = Field(..., min_length=1)
+    items: List[OrderItemCreate] = Field(..., min_length=1, max_length=settings.MAX_CART_LINES)
+
+    # Clients can send the same item on several lines, merge them into one
+    # line per item (quantities summed, notes kept) in first-seen order
+    @field_validator("items")
+    @classmethod
+    def merge_duplicate_items(cls, items: List[OrderItemCreate]):
+        merged = {}
+        notes = {}
+
+        for line in items:
+            existing = merged.get(line.item_id)
+
+            if existing is None:
+                merged[line.item_id] = line.model_copy()
+                notes[line.item_id] = [line.notes] if line.notes else []
+                continue
+
+            existing.quantity += line.quantity
+
+            if line.notes and line.notes not in notes[line.item_id]:
+                notes[line.item_id].append(line.notes)
+                existing.notes = "; ".join(notes[line.item_id])
+
+        return list(merged.values())
 
 
 class OrderUpdate(BaseModel):
@@ -56,6 +82,17 @@ class OrderStatusUpdate(BaseModel):
     status: ItemStatusEnum
 
 
+class OrderBulkStatusUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=settings.MAX_BULK_STATUS_ORDERS)
+    status: ItemStatusEnum
+
+
+class OrderBulkStatusResponse(BaseModel):
+    status: ItemStatusEnum
+    updated: List[int]
+    skipped: List[int]
+
+
 class OrderResponse(OrderBase):
     id: int
     user_id: int
@@ -74,6 +111,12 @@ class OrderDetailResponse(OrderResponse):
     order_items: List[OrderItemResponse]
 
 
+# compact listing row, no nested user / shop / item objects
+class OrderSummaryResponse(OrderResponse):
+    item_count: int
+    item_names: List[str]
+
+
 class OrderCancelRequest(BaseModel):
     cancel_reason: Optional[str] = Field(
         None,
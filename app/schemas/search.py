@@ -0,0 +1,10 @@
+from .item import ItemResponse
+from .shop import ShopResponse
+
+
+class ItemSearchResult(ItemResponse):
+    rank: float
+
+
+class ShopSearchResult(ShopResponse):
+    rank: float
@@ -24,6 +24,9 @@ class UserUpdate(BaseModel):
 
 
 class UserResponse(UserBase):
+    # validated as EmailStr on the way in. Checking stored addresses again
+    # on every response costs more than the rest of the user put together.
+    email: str = Field(..., json_schema_extra={"format": "email"})
     id: int
     is_active: bool
     created_at: datetime
@@ -0,0 +1,89 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+
+
+# A serialized catalog response, ready to be sent as is
+@dataclass(frozen=True)
+class CatalogEntry:
+    body: bytes
+    etag: str
+
+
+# Strong ETag: identical bodies and only identical bodies share it
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+# If-None-Match may list several tags or be "*"
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+# Per-process LRU of serialized shop catalogs. Keys include the shop's
+# catalog_version, so bumping the version in the database is the
+# invalidation, on every worker. Old versions just age out.
+class CatalogCache:
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[tuple, tuple[float, CatalogEntry]] = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[CatalogEntry]:
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            expires_at, catalog = entry
+
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return catalog
+
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: tuple, body: bytes) -> CatalogEntry:
+        catalog = CatalogEntry(body=body, etag=make_etag(body))
+
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return catalog
+
+        self._entries[key] = (time.monotonic() + self.ttl, catalog)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return catalog
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+catalog_cache = CatalogCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
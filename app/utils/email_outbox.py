@@ -0,0 +1,255 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.email_outbox import EmailOutbox
+from app.models.enums import EmailStatus
+from app.utils.email_sender import EmailMessage, EmailSender, get_email_sender
+
+
+logger = logging.getLogger(__name__)
+
+
+# Queue an email in the caller's transaction, it is only delivered if that
+# transaction commits. Call email_dispatcher.notify() after the commit.
+def enqueue_email(db: AsyncSession, message: EmailMessage):
+    db.add(EmailOutbox(
+        to_email=message.to_email,
+        subject=message.subject,
+        html=message.html
+    ))
+
+
+# Same as enqueue_email for many messages, as a single multi-row INSERT
+async def enqueue_emails(db: AsyncSession, messages: list[EmailMessage]):
+    if not messages:
+        return
+
+    now = datetime.now(timezone.utc)
+
+    await db.execute(
+        insert(EmailOutbox).values([
+            {
+                "to_email": message.to_email,
+                "subject": message.subject,
+                "html": message.html,
+                "status": EmailStatus.PENDING,
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now
+            }
+            for message in messages
+        ])
+    )
+
+
+# Delivers the outbox in the background with a fixed pool of worker tasks.
+#
+# A poller claims due rows with FOR UPDATE SKIP LOCKED (safe with several app
+# workers), pushes their next_attempt_at forward by a lease so a crashed
+# process doesn't lose them, and hands them to the workers in batches of
+# batch_size through a bounded queue. Each batch is one send_batch() call on
+# the provider. Failed sends are retried with exponential backoff until
+# max_attempts, then the rows are marked FAILED.
+class EmailDispatcher:
+
+    def __init__(
+        self,
+        session_maker,
+        sender: EmailSender,
+        workers: int = settings.EMAIL_WORKERS,
+        batch_size: int = settings.EMAIL_BATCH_SIZE,
+        max_attempts: int = settings.EMAIL_MAX_ATTEMPTS,
+        retry_base_seconds: int = settings.EMAIL_RETRY_BASE_SECONDS,
+        poll_interval: float = settings.EMAIL_POLL_INTERVAL_SECONDS,
+        lease_seconds: int = settings.EMAIL_CLAIM_LEASE_SECONDS
+    ):
+        self.session_maker = session_maker
+        self.sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+        self.sent_total = 0
+        self.failed_attempts_total = 0
+
+        self._queue: asyncio.Queue | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        if self._tasks:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.workers * 2)
+        self._wakeup = asyncio.Event()
+
+        self._tasks = [asyncio.create_task(self._poll())]
+        self._tasks += [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        self._tasks = []
+        self._queue = None
+        self._wakeup = None
+
+    # Deliver everything that is due right now, without the background tasks
+    async def run_once(self) -> int:
+        delivered = 0
+
+        while True:
+            rows = await self._claim(self.batch_size * self.workers)
+            if not rows:
+                return delivered
+
+            await asyncio.gather(*(self._deliver(batch) for batch in self._batches(rows)))
+            delivered += len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "sent_total": self.sent_total,
+            "failed_attempts_total": self.failed_attempts_total
+        }
+
+    async def _claim(self, limit: int):
+        now = datetime.now(timezone.utc)
+
+        due = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status == EmailStatus.PENDING,
+                EmailOutbox.next_attempt_at <= now
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due.scalar_subquery()))
+                .values(
+                    attempts=EmailOutbox.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=self.lease_seconds)
+                )
+                .returning(
+                    EmailOutbox.id,
+                    EmailOutbox.to_email,
+                    EmailOutbox.subject,
+                    EmailOutbox.html,
+                    EmailOutbox.attempts
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+
+            await session.commit()
+
+        return rows
+
+    def _batches(self, rows):
+        return [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+
+    async def _poll(self):
+        limit = self.batch_size * self.workers
+
+        while True:
+            self._wakeup.clear()
+
+            try:
+                rows = await self._claim(limit)
+            except Exception:
+                logger.exception("Claiming outbox emails failed")
+                rows = []
+
+            # blocks while the workers are busy, that is our backpressure
+            for batch in self._batches(rows):
+                await self._queue.put(batch)
+
+            if len(rows) < limit:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _work(self):
+        while True:
+            batch = await self._queue.get()
+
+            try:
+                await self._deliver(batch)
+            except Exception:
+                logger.exception("Recording delivery of %s outbox emails failed", len(batch))
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, rows):
+        messages = [
+            EmailMessage(to_email=row.to_email, subject=row.subject, html=row.html)
+            for row in rows
+        ]
+
+        try:
+            await self.sender.send_batch(messages)
+        except Exception as exc:
+            await self._record_failure(rows, exc)
+            return
+
+        async with self.session_maker() as session:
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_([row.id for row in rows]))
+                .values(status=EmailStatus.SENT, sent_at=datetime.now(timezone.utc), last_error=None)
+            )
+            await session.commit()
+
+        self.sent_total += len(rows)
+
+    async def _record_failure(self, rows, exc: Exception):
+        # rows of a batch normally share the attempt count, one UPDATE per count
+        by_attempts = {}
+        for row in rows:
+            by_attempts.setdefault(row.attempts, []).append(row.id)
+
+        async with self.session_maker() as session:
+            for attempts, ids in by_attempts.items():
+                values = {"last_error": repr(exc)[:1000]}
+
+                if attempts >= self.max_attempts:
+                    values["status"] = EmailStatus.FAILED
+                    logger.error("Giving up on outbox emails %s after %s attempts: %r", ids, attempts, exc)
+                else:
+                    delay = min(self.retry_base_seconds * 2 ** (attempts - 1), 3600)
+                    values["next_attempt_at"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                    logger.warning("Outbox emails %s failed (attempt %s), retrying in %ss: %r", ids, attempts, delay, exc)
+
+                await session.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(ids))
+                    .values(**values)
+                )
+
+            await session.commit()
+
+        self.failed_attempts_total += len(rows)
+
+
+email_dispatcher = EmailDispatcher(async_session_maker, get_email_sender())
@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass
+class EmailMessage:
+    to_email: str
+    subject: str
+    html: str
+
+
+# Provider interface used by the EmailDispatcher, raise on failure so the
+# messages are retried
+class EmailSender(ABC):
+
+    @abstractmethod
+    async def send(self, message: EmailMessage) -> None:
+        ...
+
+    # Providers with a batch API override this to send in one call
+    async def send_batch(self, messages: list[EmailMessage]) -> None:
+        for message in messages:
+            await self.send(message)
+
+
+# In-memory sender for local runs and tests, nothing leaves the process.
+# `calls` counts outbound calls, a batch counts as one.
+class FakeEmailSender(EmailSender):
+
+    def __init__(self):
+        self.sent: list[EmailMessage] = []
+        self.calls = 0
+
+    async def send(self, message: EmailMessage) -> None:
+        self.calls += 1
+        self.sent.append(message)
+
+    async def send_batch(self, messages: list[EmailMessage]) -> None:
+        self.calls += 1
+        self.sent.extend(messages)
+
+
+def get_email_sender() -> EmailSender:
+    if settings.EMAIL_BACKEND == "fake":
+        return FakeEmailSender()
+
+    if settings.EMAIL_BACKEND == "resend":
+        from app.utils.resend_email_service import ResendEmailSender
+        return ResendEmailSender(settings.RESEND_API_KEY, settings.EMAIL_FROM)
+
+    raise ValueError(f"Unknown EMAIL_BACKEND '{settings.EMAIL_BACKEND}'")
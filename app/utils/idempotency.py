@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.idempotency_key import IdempotencyKey
+
+
+logger = logging.getLogger(__name__)
+
+
+def request_hash(body: str) -> str:
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+# Claim an Idempotency-Key in the caller's transaction. Returns the id of the
+# new key row, or None when the key was already used (the caller replays).
+#
+# INSERT ... ON CONFLICT DO NOTHING waits on an uncommitted row with the same
+# key, so a concurrent duplicate blocks here until the first request commits
+# (and then sees the stored response) or rolls back (and takes over the key).
+# Requests with other keys, of the same user or shop, are not held up.
+async def claim_idempotency_key(db: AsyncSession, user_id: int, key: str, body_hash: str) -> Optional[int]:
+    now = datetime.now(timezone.utc)
+
+    result = await db.execute(
+        pg_insert(IdempotencyKey)
+        .values(
+            user_id=user_id,
+            key=key,
+            request_hash=body_hash,
+            created_at=now,
+            expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKey.id)
+    )
+
+    return result.scalar_one_or_none()
+
+
+# The response stored under a used key, refused if the key came with a
+# different request body
+async def replay_response(db: AsyncSession, user_id: int, key: str, body_hash: str) -> JSONResponse:
+    result = await db.execute(
+        select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    )
+    stored = result.one_or_none()
+
+    # end the transaction, nothing else happens in this request
+    await db.rollback()
+
+    # purged between the claim and this select, let the client retry
+    if stored is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Request with this Idempotency-Key is not complete, retry",
+            headers={"Retry-After": "1"}
+        )
+
+    if stored.request_hash != body_hash:
+        raise HTTPException(
+            status_code=409,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+    return JSONResponse(
+        content=stored.response_body,
+        status_code=stored.status_code,
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+# Store the response under the claimed key, before the caller commits
+async def save_idempotent_response(db: AsyncSession, key_id: int, order_id: int, status_code: int, body: dict):
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.id == key_id)
+        .values(order_id=order_id, status_code=status_code, response_body=body)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Deletes expired keys in the background, batch_size rows per statement so a
+# large backlog never holds locks for long
+class IdempotencyKeyCleaner:
+
+    def __init__(
+        self,
+        session_maker,
+        interval: float = settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS,
+        batch_size: int = settings.IDEMPOTENCY_CLEANUP_BATCH_SIZE
+    ):
+        self.session_maker = session_maker
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self.deleted_total = 0
+
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self) -> int:
+        deleted = 0
+
+        while True:
+            expired = (
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+
+            async with self.session_maker() as session:
+                result = await session.execute(
+                    delete(IdempotencyKey)
+                    .where(IdempotencyKey.id.in_(expired.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+
+            deleted += result.rowcount
+            self.deleted_total += result.rowcount
+
+            if result.rowcount < self.batch_size:
+                return deleted
+
+    async def _run(self):
+        while True:
+            try:
+                deleted = await self.run_once()
+                if deleted:
+                    logger.info("Deleted %s expired idempotency keys", deleted)
+            except Exception:
+                logger.exception("Deleting expired idempotency keys failed")
+
+            await asyncio.sleep(self.interval)
+
+
+idempotency_cleaner = IdempotencyKeyCleaner(async_session_maker)
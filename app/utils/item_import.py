@@ -0,0 +1,158 @@
+import csv
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+
+# A parsed upload row: its 1-based position and either the raw field dict
+# or the reason it could not be parsed
+ImportRow = tuple[int, dict | None, str | None]
+
+
+# The rest of a streamed upload can't be read. Earlier chunks may already be
+# committed, so the import stops and reports instead of failing the request.
+class ImportTruncated(Exception):
+    pass
+
+
+# Decoded lines of the request body, read as it streams in
+async def _lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    first = True
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            text = line.decode("utf-8", errors="replace").rstrip("\r")
+
+            if first:
+                text, first = text.lstrip("\ufeff"), False
+
+            yield text
+
+        # after the complete lines, so everything before the long one is read
+        if len(buffer) > settings.ITEM_IMPORT_MAX_LINE_BYTES:
+            raise ImportTruncated(f"Line longer than {settings.ITEM_IMPORT_MAX_LINE_BYTES} bytes")
+
+    if buffer:
+        text = buffer.decode("utf-8", errors="replace").rstrip("\r")
+        yield text.lstrip("\ufeff") if first else text
+
+
+# One JSON object per line, blank lines are skipped
+async def iter_ndjson_rows(request: Request) -> AsyncIterator[ImportRow]:
+    row = 0
+
+    async for line in _lines(request):
+        if not line.strip():
+            continue
+
+        row += 1
+
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f"Invalid JSON: {exc}"
+            continue
+
+        if not isinstance(data, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+
+        yield row, data, None
+
+
+# CSV with a header row naming the item fields. Empty cells count as missing
+# so the schema defaults apply. A record may span lines inside quotes.
+async def iter_csv_rows(request: Request) -> AsyncIterator[ImportRow]:
+    header = None
+    pending = []
+    row = 0
+
+    async for line in _lines(request):
+        pending.append(line)
+
+        # inside a quoted field until the quotes balance out
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+
+        record = next(csv.reader(["\n".join(pending)]), [])
+        pending = []
+
+        if not any(cell.strip() for cell in record):
+            continue
+
+        if header is None:
+            header = [cell.strip() for cell in record]
+            continue
+
+        row += 1
+
+        if len(record) > len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(record)}"
+            continue
+
+        yield row, {key: value for key, value in zip(header, record) if value != ""}, None
+
+    if pending:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+# A JSON array of objects. It has to be parsed whole, so its size is capped.
+async def iter_json_rows(request: Request) -> AsyncIterator[ImportRow]:
+    body = bytearray()
+
+    async for chunk in request.stream():
+        body += chunk
+
+        if len(body) > settings.ITEM_IMPORT_MAX_JSON_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail="JSON upload too large, send CSV or NDJSON instead"
+            )
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid JSON body"
+        )
+
+    if not isinstance(data, list):
+        raise HTTPException(
+            status_code=400,
+            detail="Expected a JSON array of items"
+        )
+
+    for row, entry in enumerate(data, start=1):
+        if isinstance(entry, dict):
+            yield row, entry, None
+        else:
+            yield row, None, "Expected a JSON object"
+
+
+IMPORT_FORMATS = {
+    "application/json": iter_json_rows,
+    "application/x-ndjson": iter_ndjson_rows,
+    "application/jsonl": iter_ndjson_rows,
+    "text/csv": iter_csv_rows
+}
+
+
+def iter_import_rows(request: Request) -> AsyncIterator[ImportRow]:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parser = IMPORT_FORMATS.get(content_type)
+
+    if parser is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send items as application/json, application/x-ndjson or text/csv"
+        )
+
+    return parser(request)
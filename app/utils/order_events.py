@@ -0,0 +1,282 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.enums import ItemStatus
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sent to a subscriber when it may have missed events (its queue overflowed,
+# or the cross-worker listener reconnected). Clients refetch their orders.
+RESYNC = {"type": "resync"}
+
+
+class OrderEventsBusy(Exception):
+    pass
+
+
+def order_event(event_type: str, order_id: int, user_id: int, shop_id: int, status: ItemStatus, at: datetime) -> dict:
+    return {
+        "type": event_type,
+        "order_id": order_id,
+        "user_id": user_id,
+        "shop_id": shop_id,
+        "status": ItemStatus(status).value,
+        "at": at.isoformat()
+    }
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def shop_channel(shop_id: int) -> str:
+    return f"shop:{shop_id}"
+
+
+# One connected client: the channels it listens to and a bounded queue of
+# events not yet written to it. A client that falls queue_size events behind
+# is cut off with a RESYNC instead of buffering without limit.
+class Subscription:
+
+    def __init__(self, channels: set[str], queue_size: int):
+        self.channels = frozenset(channels)
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event: dict) -> bool:
+        if self.closed:
+            return False
+
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflow()
+            return False
+
+    # drop what is queued and leave only a RESYNC, the stream ends after it
+    def overflow(self):
+        self.closed = True
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+        self._queue.put_nowait(RESYNC)
+
+    # next event, None if nothing arrived within timeout
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# Fans order events out to the subscriptions of this worker. Subclasses decide
+# how a published event reaches the workers: directly, or through a shared
+# channel every worker listens to.
+class OrderEventBroker(ABC):
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+
+        self.published_total = 0
+        self.delivered_total = 0
+        self.overflows_total = 0
+
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._count = 0
+
+    def full(self) -> bool:
+        return self._count >= self.max_subscribers
+
+    def subscribe(self, channels: set[str]) -> Subscription:
+        if self.full():
+            raise OrderEventsBusy()
+
+        subscription = Subscription(channels, self.queue_size)
+
+        for channel in subscription.channels:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+        self._count -= 1
+
+    # Publish events after the transaction that made them has committed.
+    # Never raises, a lost event only means clients see the change on their
+    # next refetch.
+    @abstractmethod
+    async def publish(self, events: list[dict]):
+        ...
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self._count,
+            "published_total": self.published_total,
+            "delivered_total": self.delivered_total,
+            "overflows_total": self.overflows_total
+        }
+
+    def _dispatch(self, event: dict):
+        # a shop owner ordering from their own shop may listen on both channels
+        recipients = set()
+
+        for channel in (user_channel(event["user_id"]), shop_channel(event["shop_id"])):
+            recipients |= self._subscribers.get(channel, set())
+
+        for subscription in recipients:
+            if subscription.closed:
+                continue
+
+            if subscription.offer(event):
+                self.delivered_total += 1
+            else:
+                self.overflows_total += 1
+
+    def _resync_all(self):
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.offer(RESYNC)
+
+
+# Single worker setups: events only reach clients connected to this process
+class InMemoryOrderEventBroker(OrderEventBroker):
+
+    async def publish(self, events: list[dict]):
+        for event in events:
+            self.published_total += 1
+            self._dispatch(event)
+
+
+# Cross-worker fan-out through Postgres LISTEN/NOTIFY. Publishing is a
+# pg_notify per event on a pooled connection; every worker (this one
+# included) keeps one dedicated connection listening and dispatches what
+# arrives to its own subscriptions. Notifications sent while the listener is
+# down are lost, so subscribers get a RESYNC when it reconnects.
+class PostgresOrderEventBroker(OrderEventBroker):
+    CHANNEL = "order_events"
+
+    def __init__(self, database_url: str, queue_size: int, max_subscribers: int, reconnect_seconds: float):
+        super().__init__(queue_size, max_subscribers)
+
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.reconnect_seconds = reconnect_seconds
+
+        self._task: asyncio.Task | None = None
+
+    async def publish(self, events: list[dict]):
+        if not events:
+            return
+
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(
+                    text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                    {"channel": self.CHANNEL, "payloads": [json.dumps(event) for event in events]}
+                )
+                await connection.commit()
+        except Exception:
+            logger.exception("Publishing %s order events failed", len(events))
+            return
+
+        self.published_total += len(events)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self):
+        reconnecting = False
+
+        while True:
+            connection = None
+
+            try:
+                connection = await asyncpg.connect(self.dsn)
+
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.CHANNEL, self._on_notify)
+
+                if reconnecting:
+                    self._resync_all()
+
+                await lost.wait()
+                logger.warning("Order events listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order events listener failed")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            reconnecting = True
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed order event %r", payload)
+            return
+
+        self._dispatch(event)
+
+
+def _build_broker() -> OrderEventBroker:
+    if settings.ORDER_EVENTS_BACKEND == "memory":
+        return InMemoryOrderEventBroker(
+            settings.ORDER_EVENTS_QUEUE_SIZE,
+            settings.ORDER_EVENTS_MAX_SUBSCRIBERS
+        )
+
+    if settings.ORDER_EVENTS_BACKEND == "postgres":
+        return PostgresOrderEventBroker(
+            settings.DATABASE_URL,
+            settings.ORDER_EVENTS_QUEUE_SIZE,
+            settings.ORDER_EVENTS_MAX_SUBSCRIBERS,
+            settings.ORDER_EVENTS_RECONNECT_SECONDS
+        )
+
+    raise ValueError(f"Unknown ORDER_EVENTS_BACKEND '{settings.ORDER_EVENTS_BACKEND}'")
+
+
+order_events = _build_broker()
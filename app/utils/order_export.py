@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+
+# One exported row per order line, in this column order
+EXPORT_COLUMNS = (
+    "order_id",
+    "created_at",
+    "status",
+    "customer_id",
+    "customer_email",
+    "delivery_address",
+    "order_notes",
+    "total_amount",
+    "cancelled_at",
+    "line_id",
+    "item_id",
+    "sku",
+    "item_name",
+    "quantity",
+    "unit_price",
+    "subtotal",
+    "line_notes"
+)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def ndjson_chunk(rows) -> bytes:
+    return "".join(
+        json.dumps({name: _plain(value) for name, value in zip(EXPORT_COLUMNS, row)}) + "\n"
+        for row in rows
+    ).encode()
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+# Spreadsheets run a cell starting with one of these as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+# Addresses, notes and names come from customers and shops. Text that would
+# be read as a formula is quoted with a leading ' so it shows as typed.
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return _plain(value)
+
+
+def csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+
+    return buffer.getvalue().encode()
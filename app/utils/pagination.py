@@ -0,0 +1,94 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+# Cursors are opaque to clients: a url-safe base64 encoded JSON list of the
+# sort key values of the last row on the previous page.
+def encode_cursor(*values) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":")
+    )
+
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+    if not isinstance(values, list):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+    return values
+
+
+# decode a (created_at, id) cursor used by the newest-first listings
+def decode_created_at_cursor(cursor: str) -> tuple[datetime, int]:
+    values = decode_cursor(cursor)
+
+    try:
+        created_at, row_id = values
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+
+# decode an id cursor used by the oldest-first listings
+def decode_id_cursor(cursor: str) -> int:
+    values = decode_cursor(cursor)
+
+    try:
+        (row_id,) = values
+        return int(row_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+
+# decode a (rank, id) cursor used by the search results
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    values = decode_cursor(cursor)
+
+    try:
+        rank, row_id = values
+        return float(rank), int(row_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+
+# Rows must be fetched with `limit + 1` so we know if another page exists
+def build_page(rows, limit: int, cursor_key) -> dict:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(*cursor_key(rows[-1]))
+
+    return {
+        "items": rows,
+        "next_cursor": next_cursor
+    }
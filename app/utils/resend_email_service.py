@@ -1,9 +1,42 @@
+import asyncio
+
 import resend
-from app.core.config import settings
 
-resend.api_key = settings.RESEND_API_KEY
+from app.utils.email_sender import EmailMessage, EmailSender
+
+
+# Resend accepts at most 100 emails per batch call
+RESEND_BATCH_LIMIT = 100
+
+
+class ResendEmailSender(EmailSender):
+
+    def __init__(self, api_key: str, from_email: str):
+        resend.api_key = api_key
+        self.from_email = from_email
 
-async def send_order_ready_email(to_email: str, order: dict):
+    def _params(self, message: EmailMessage) -> dict:
+        return {
+            "from": self.from_email,
+            "to": message.to_email,
+            "subject": message.subject,
+            "html": message.html
+        }
+
+    # the resend client is blocking, keep it off the event loop
+    async def send(self, message: EmailMessage) -> None:
+        await asyncio.to_thread(resend.Emails.send, self._params(message))
+
+    async def send_batch(self, messages: list[EmailMessage]) -> None:
+        if len(messages) == 1:
+            return await self.send(messages[0])
+
+        for start in range(0, len(messages), RESEND_BATCH_LIMIT):
+            chunk = messages[start:start + RESEND_BATCH_LIMIT]
+            await asyncio.to_thread(resend.Batch.send, [self._params(m) for m in chunk])
+
+
+def order_ready_email(to_email: str, order: dict) -> EmailMessage:
     
     html_content = f"""
     <h2>Your Order #{order['id']} is Ready!</h2>
@@ -22,15 +55,14 @@ async def send_order_ready_email(to_email: str, order: dict):
     <p>Thank you for ordering!</p>
     """
 
-    return resend.Emails.send({
-        "from": "onboarding@resend.dev",
-        "to": to_email,
-        "subject": f"Your Order #{order['id']} is Ready",
-        "html": html_content
-    })
+    return EmailMessage(
+        to_email=to_email,
+        subject=f"Your Order #{order['id']} is Ready",
+        html=html_content
+    )
 
 
-async def send_order_picked_email(to_email: str, order: dict):
+def order_picked_email(to_email: str, order: dict) -> EmailMessage:
 
     html_content = f"""
     <h2>Your Order #{order['id']} is Picked!</h2>
@@ -49,10 +81,8 @@ async def send_order_picked_email(to_email: str, order: dict):
     <p>Thank you for Shoping with us!</p>
     """
 
-    return resend.Emails.send({
-        "from": "onboarding@resend.dev",
-        "to": to_email,
-        "subject": f"Your Order #{order['id']} is Picked",
-        "html": html_content
-    })
-
+    return EmailMessage(
+        to_email=to_email,
+        subject=f"Your Order #{order['id']} is Picked",
+        html=html_content
+    )
@@ -0,0 +1,239 @@
+# Daily sales rollups: incremental updates from the order endpoints and a
+# rebuild from history for backfills and repairs:
+#
+#     python -m app.utils.sales_rollup
+#     python -m app.utils.sales_rollup --shop-id 42
+import argparse
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker, engine
+from app.models.enums import ItemStatus
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.shop import Shop
+from app.models.sales_rollup import ShopDailySales, ItemDailySales
+
+
+SHOP_COUNTERS = ("orders_count", "revenue", "items_sold", "cancelled_count", "cancelled_revenue", "cancelled_items")
+
+ITEM_COUNTERS = ("orders_count", "quantity", "revenue", "cancelled_quantity", "cancelled_revenue")
+
+# first key of the per shop advisory locks, the second is the shop id
+ROLLUP_LOCK = 7301
+
+
+# rollup day of an order, orders are bucketed by creation date in UTC
+def sales_day(created_at: datetime) -> date:
+    return created_at.astimezone(timezone.utc).date()
+
+
+# INSERT the rows or add their counters to the existing ones
+def _increment(model, keys: list[str], counters, rows: list[dict]):
+    statement = pg_insert(model).values(rows)
+    table = model.__table__
+
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            **{name: table.c[name] + statement.excluded[name] for name in counters},
+            "updated_at": statement.excluded.updated_at
+        }
+    )
+
+
+# Add deltas to a shop day and its item days, in the caller's transaction.
+# The shop row is written first and the item rows in id order, so concurrent
+# orders lock their rollup rows in the same order. The shared lock on the
+# shop only waits for a rebuild_rollups() of that shop, never for other orders.
+async def _record(db: AsyncSession, shop_id: int, day: date, shop_delta: dict, item_deltas: dict[int, dict]):
+    now = datetime.now(timezone.utc)
+
+    await db.execute(select(func.pg_advisory_xact_lock_shared(ROLLUP_LOCK, shop_id)))
+
+    await db.execute(_increment(
+        ShopDailySales,
+        ["shop_id", "day"],
+        SHOP_COUNTERS,
+        [{"shop_id": shop_id, "day": day, "updated_at": now, **dict.fromkeys(SHOP_COUNTERS, 0), **shop_delta}]
+    ))
+
+    await db.execute(_increment(
+        ItemDailySales,
+        ["item_id", "day"],
+        ITEM_COUNTERS,
+        [
+            {
+                "item_id": item_id,
+                "day": day,
+                "shop_id": shop_id,
+                "updated_at": now,
+                **dict.fromkeys(ITEM_COUNTERS, 0),
+                **delta
+            }
+            for item_id, delta in sorted(item_deltas.items())
+        ]
+    ))
+
+
+# quantity and revenue per item of an order, lines are (item_id, quantity, subtotal)
+def _per_item(lines) -> dict[int, tuple[int, object]]:
+    per_item = {}
+
+    for item_id, quantity, subtotal in lines:
+        total_quantity, total_revenue = per_item.get(item_id, (0, 0))
+        per_item[item_id] = (total_quantity + quantity, total_revenue + subtotal)
+
+    return per_item
+
+
+async def record_order_placed(db: AsyncSession, shop_id: int, created_at: datetime, total_amount, lines):
+    per_item = _per_item(lines)
+
+    await _record(
+        db,
+        shop_id,
+        sales_day(created_at),
+        {
+            "orders_count": 1,
+            "revenue": total_amount,
+            "items_sold": sum(quantity for quantity, _ in per_item.values())
+        },
+        {
+            item_id: {"orders_count": 1, "quantity": quantity, "revenue": revenue}
+            for item_id, (quantity, revenue) in per_item.items()
+        }
+    )
+
+
+# counted on the day the order was placed, not the day it was cancelled
+async def record_order_cancelled(db: AsyncSession, shop_id: int, created_at: datetime, total_amount, lines):
+    per_item = _per_item(lines)
+
+    await _record(
+        db,
+        shop_id,
+        sales_day(created_at),
+        {
+            "cancelled_count": 1,
+            "cancelled_revenue": total_amount,
+            "cancelled_items": sum(quantity for quantity, _ in per_item.values())
+        },
+        {
+            item_id: {"cancelled_quantity": quantity, "cancelled_revenue": revenue}
+            for item_id, (quantity, revenue) in per_item.items()
+        }
+    )
+
+
+# Recompute one shop's rollups from orders and order_items, in the caller's
+# transaction.
+#
+# The exclusive lock on the shop waits for orders that already hold the
+# shared one in _record() to commit, so the SELECTs below count them; orders
+# of the shop placed or cancelled meanwhile wait for our commit and add their
+# delta on top. Other shops are not held up.
+async def rebuild_rollups(db: AsyncSession, shop_id: int):
+    # reads the shop's whole history, not a slow statement
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        await db.execute(text("SET LOCAL statement_timeout = 0"))
+
+    await db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK, shop_id)))
+
+    day = func.date(func.timezone("UTC", Order.created_at))
+    cancelled = Order.status == ItemStatus.CANCELLED
+
+    await db.execute(delete(ItemDailySales).where(ItemDailySales.shop_id == shop_id))
+    await db.execute(delete(ShopDailySales).where(ShopDailySales.shop_id == shop_id))
+
+    order_quantities = (
+        select(OrderItem.order_id, func.sum(OrderItem.quantity).label("quantity"))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.shop_id == shop_id)
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    items = func.coalesce(order_quantities.c.quantity, 0)
+
+    shop_rows = (
+        select(
+            Order.shop_id,
+            day.label("day"),
+            func.count(),
+            func.sum(Order.total_amount),
+            func.sum(items),
+            func.count().filter(cancelled),
+            func.coalesce(func.sum(Order.total_amount).filter(cancelled), 0),
+            func.coalesce(func.sum(items).filter(cancelled), 0)
+        )
+        .outerjoin(order_quantities, order_quantities.c.order_id == Order.id)
+        .where(Order.shop_id == shop_id)
+        .group_by(Order.shop_id, day)
+    )
+
+    item_rows = (
+        select(
+            OrderItem.item_id,
+            day.label("day"),
+            Order.shop_id,
+            func.count(func.distinct(Order.id)),
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.subtotal),
+            func.coalesce(func.sum(OrderItem.quantity).filter(cancelled), 0),
+            func.coalesce(func.sum(OrderItem.subtotal).filter(cancelled), 0)
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.shop_id == shop_id)
+        .group_by(OrderItem.item_id, day, Order.shop_id)
+    )
+
+    await db.execute(
+        pg_insert(ShopDailySales).from_select(["shop_id", "day", *SHOP_COUNTERS], shop_rows)
+    )
+    await db.execute(
+        pg_insert(ItemDailySales).from_select(["item_id", "day", "shop_id", *ITEM_COUNTERS], item_rows)
+    )
+
+
+# Every shop's rollups, one transaction per shop so order writes only ever
+# wait for the shop being rebuilt. Returns the number of shops.
+async def rebuild_all_rollups(session_maker) -> int:
+    async with session_maker() as session:
+        shop_ids = (await session.execute(select(Shop.id).order_by(Shop.id))).scalars().all()
+
+    for shop_id in shop_ids:
+        async with session_maker() as session:
+            await rebuild_rollups(session, shop_id)
+            await session.commit()
+
+    return len(shop_ids)
+
+
+async def _main(shop_id: Optional[int]):
+    if shop_id is None:
+        await rebuild_all_rollups(async_session_maker)
+    else:
+        async with async_session_maker() as session:
+            await rebuild_rollups(session, shop_id)
+            await session.commit()
+
+    async with async_session_maker() as session:
+        shops = (await session.execute(select(func.count()).select_from(ShopDailySales))).scalar_one()
+        items = (await session.execute(select(func.count()).select_from(ItemDailySales))).scalar_one()
+
+    await engine.dispose()
+    print(f"rebuilt {shops} shop days and {items} item days")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales rollups from order history")
+    parser.add_argument("--shop-id", type=int, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(_main(args.shop_id))
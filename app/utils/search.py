@@ -0,0 +1,88 @@
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import Double, and_, case, cast, func, literal_column, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.item import Item
+from app.models.shop import Shop
+
+
+# What a search runs over: the weighted tsvector column for full text
+# search and the raw text columns, most important first, for LIKE matching
+@dataclass(frozen=True)
+class SearchTarget:
+    vector: ColumnElement
+    columns: tuple
+
+
+ITEM_SEARCH = SearchTarget(Item.search_vector, (Item.name, Item.category, Item.description))
+SHOP_SEARCH = SearchTarget(Shop.search_vector, (Shop.name, Shop.description))
+
+
+# words of the query, lowercased, punctuation and underscores dropped
+def search_terms(text: str) -> list[str]:
+    return re.findall(r"[^\W_]+", text.lower())[:settings.SEARCH_MAX_TERMS]
+
+
+# Turns a search query into a WHERE condition and a rank expression (a
+# double, higher is better) for a target. Callers order by rank, then id.
+class SearchBackend(ABC):
+
+    @abstractmethod
+    def match(self, target: SearchTarget, terms: list[str]) -> tuple[ColumnElement, ColumnElement]:
+        ...
+
+
+# Postgres full text search on the generated search_vector columns, served by
+# their GIN indexes. Every term must match, as a prefix so results show up
+# while the user is still typing. Ranked with ts_rank (A/B/C weights).
+class PostgresSearchBackend(SearchBackend):
+
+    def match(self, target, terms):
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"),
+            " & ".join(f"{term}:*" for term in terms)
+        )
+
+        condition = target.vector.op("@@")(tsquery)
+        rank = cast(func.ts_rank(target.vector, tsquery), Double)
+
+        return condition, rank
+
+
+# Case insensitive substring matching with ILIKE, no index can serve it.
+# Works on any database, used as a fallback and as the benchmark baseline.
+class LikeSearchBackend(SearchBackend):
+
+    def match(self, target, terms):
+        condition = and_(*[
+            or_(*[column.icontains(term, autoescape=True) for column in target.columns])
+            for term in terms
+        ])
+
+        # rows whose main column starts with the first term come first
+        rank = cast(
+            case((target.columns[0].istartswith(terms[0], autoescape=True), 1.0), else_=0.5),
+            Double
+        )
+
+        return condition, rank
+
+
+def get_search_backend(name: Optional[str] = None) -> SearchBackend:
+    name = name or settings.SEARCH_BACKEND
+
+    if name == "postgres":
+        return PostgresSearchBackend()
+
+    if name == "like":
+        return LikeSearchBackend()
+
+    raise ValueError(f"Unknown SEARCH_BACKEND '{name}'")
+
+
+search_backend = get_search_backend()
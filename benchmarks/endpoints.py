@@ -0,0 +1,353 @@
+"""Endpoint load benchmark on a seeded dataset.
+
+Drives login, create_order, get_shop_orders, update_order_status and
+cancel_order at ``--concurrency`` concurrent requests each, through an
+in-process ASGI client (default) or a running server (``--base-url``), and
+reports throughput and latency percentiles per scenario. Results are saved
+as JSON; ``--baseline`` compares them to an earlier run, e.g. from the
+previous commit.
+
+Seed first (see benchmarks.seed), then:
+
+    python -m benchmarks.endpoints --requests 500 --concurrency 32
+    python -m benchmarks.endpoints --base-url http://127.0.0.1:8000 --baseline benchmarks/results/<earlier>.json
+
+Orders created, updated and cancelled by a run stay in the dataset.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import asyncpg
+import httpx
+
+from app.core.config import settings
+from benchmarks.seed import PASSWORD, dsn
+from benchmarks.stock_contention import percentile
+
+
+SCENARIOS = ["login", "get_shop_orders", "create_order", "update_order_status", "cancel_order"]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+# What the scenarios pick from: a sample of seeded owners with their shop and
+# items, customers, and pending orders to update or cancel
+class Dataset:
+
+    def __init__(self, owners, customers, items, pending_by_shop, pending_by_customer, counts):
+        self.owners = owners
+        self.customers = customers
+        self.items = items
+        self.pending_by_shop = pending_by_shop
+        self.pending_by_customer = pending_by_customer
+        self.counts = counts
+
+
+async def load_dataset(tag: str, sample: int, pending: int) -> Dataset:
+    connection = await asyncpg.connect(dsn())
+
+    try:
+        owners = await connection.fetch(
+            """
+            SELECT users.id, users.email, shops.id AS shop_id FROM users
+            JOIN shops ON shops.owner_id = users.id
+            WHERE users.email LIKE $1 ORDER BY users.id LIMIT $2
+            """,
+            f"{tag}-owner-%",
+            sample
+        )
+        customers = await connection.fetch(
+            "SELECT id, email FROM users WHERE email LIKE $1 ORDER BY id LIMIT $2",
+            f"{tag}-customer-%",
+            sample
+        )
+
+        if not owners or not customers:
+            raise SystemExit(f"no dataset '{tag}', run python -m benchmarks.seed --tag {tag} first")
+
+        shop_ids = [owner["shop_id"] for owner in owners]
+        customer_ids = [customer["id"] for customer in customers]
+
+        items = {}
+        for row in await connection.fetch(
+            "SELECT id, shop_id FROM items WHERE shop_id = ANY($1) AND is_available", shop_ids
+        ):
+            items.setdefault(row["shop_id"], []).append(row["id"])
+
+        # pending orders of the sampled customers are cancelled by them, the
+        # other pending orders of the sampled shops are updated by the owners
+        pending_by_customer = {}
+        for row in await connection.fetch(
+            "SELECT id, user_id FROM orders WHERE status = 'PENDING' AND user_id = ANY($1) LIMIT $2",
+            customer_ids,
+            pending
+        ):
+            pending_by_customer.setdefault(row["user_id"], []).append(row["id"])
+
+        pending_by_shop = {}
+        for row in await connection.fetch(
+            "SELECT id, shop_id FROM orders WHERE status = 'PENDING' AND shop_id = ANY($1) AND NOT user_id = ANY($2) LIMIT $3",
+            shop_ids,
+            customer_ids,
+            pending
+        ):
+            pending_by_shop.setdefault(row["shop_id"], []).append(row["id"])
+
+        counts = {
+            table: await connection.fetchval(f"SELECT reltuples::bigint FROM pg_class WHERE relname = '{table}'")
+            for table in ("users", "shops", "items", "orders", "order_items")
+        }
+    finally:
+        await connection.close()
+
+    return Dataset(owners, customers, items, pending_by_shop, pending_by_customer, counts)
+
+
+async def login(client, email: str) -> dict:
+    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+# Each scenario returns a coroutine factory: next_request(rng) -> response, or
+# None once it has run out of rows to act on (pending orders)
+def build_scenarios(client, dataset: Dataset, tokens: dict):
+    owners = [owner for owner in dataset.owners if dataset.items.get(owner["shop_id"])]
+
+    async def login_request(rng):
+        return await client.post("/auth/login", json={
+            "email": rng.choice(dataset.customers)["email"],
+            "password": PASSWORD
+        })
+
+    async def get_shop_orders(rng):
+        owner = rng.choice(owners)
+        params = {"limit": 20}
+        if rng.random() < 0.3:
+            params["status"] = "pending"
+
+        return await client.get(f"/orders/shop/{owner['shop_id']}", params=params, headers=tokens[owner["email"]])
+
+    async def create_order(rng):
+        customer = rng.choice(dataset.customers)
+        shop_id = rng.choice(owners)["shop_id"]
+        items = rng.sample(dataset.items[shop_id], min(rng.randint(1, 3), len(dataset.items[shop_id])))
+
+        return await client.post("/orders/create", json={
+            "shop_id": shop_id,
+            "items": [{"item_id": item_id, "quantity": rng.randint(1, 3)} for item_id in items]
+        }, headers=tokens[customer["email"]])
+
+    owner_by_shop = {owner["shop_id"]: owner for owner in dataset.owners}
+    to_update = [(shop_id, order_id) for shop_id, ids in dataset.pending_by_shop.items() for order_id in ids]
+
+    async def update_order_status(rng):
+        if not to_update:
+            return None
+
+        shop_id, order_id = to_update.pop()
+        return await client.patch(
+            f"/orders/{order_id}/status",
+            json={"status": "ready"},
+            headers=tokens[owner_by_shop[shop_id]["email"]]
+        )
+
+    customer_by_id = {customer["id"]: customer for customer in dataset.customers}
+    to_cancel = [(user_id, order_id) for user_id, ids in dataset.pending_by_customer.items() for order_id in ids]
+
+    async def cancel_order(rng):
+        if not to_cancel:
+            return None
+
+        user_id, order_id = to_cancel.pop()
+        return await client.patch(
+            f"/orders/{order_id}/cancel",
+            json={"cancel_reason": "benchmark"},
+            headers=tokens[customer_by_id[user_id]["email"]]
+        )
+
+    return {
+        "login": login_request,
+        "get_shop_orders": get_shop_orders,
+        "create_order": create_order,
+        "update_order_status": update_order_status,
+        "cancel_order": cancel_order
+    }
+
+
+async def run_scenario(next_request, requests: int, concurrency: int, seed: int) -> dict:
+    latencies = []
+    status_codes = {}
+    remaining = requests
+
+    async def worker(index):
+        nonlocal remaining
+        rng = random.Random(seed * 1000 + index)
+
+        while remaining > 0:
+            remaining -= 1
+
+            started = time.perf_counter()
+            response = await next_request(rng)
+            if response is None:
+                return
+
+            latencies.append(time.perf_counter() - started)
+            status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        return {"requests": 0}
+
+    errors = sum(count for status, count in status_codes.items() if status >= 400)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(status): count for status, count in sorted(status_codes.items())},
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2)
+        }
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict, baseline: dict | None):
+    print(f"{'scenario':<22}{'req':>6}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+    for name, result in results["scenarios"].items():
+        if not result["requests"]:
+            print(f"{name:<22}{'no data to act on':>20}")
+            continue
+
+        latency = result["latency_ms"]
+        print(
+            f"{name:<22}{result['requests']:>6}{result['errors']:>6}{result['throughput_rps']:>9.1f}"
+            f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['p99']:>9.1f}"
+        )
+
+        before = (baseline or {}).get("scenarios", {}).get(name)
+        if before and before.get("requests"):
+            print(
+                f"{'  vs ' + baseline['commit']:<34}"
+                f"{(result['throughput_rps'] / before['throughput_rps'] - 1) * 100:>+8.0f}%"
+                f"{(latency['p50'] / before['latency_ms']['p50'] - 1) * 100:>+8.0f}%"
+                f"{(latency['p95'] / before['latency_ms']['p95'] - 1) * 100:>+8.0f}%"
+                f"{(latency['p99'] / before['latency_ms']['p99'] - 1) * 100:>+8.0f}%"
+            )
+
+
+async def run(args):
+    warmup = min(args.concurrency, 20)
+    dataset = await load_dataset(args.tag, args.sample, args.requests + warmup)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=120)
+        target = args.base_url
+    else:
+        from app.main import app
+        # an unhandled error counts as a 500 instead of ending the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120)
+        target = "asgi"
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": target,
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "dataset": {"tag": args.tag, **dataset.counts},
+        "environment": {
+            "python": platform.python_version(),
+            "db_pool_size": settings.DB_POOL_SIZE,
+            "db_max_overflow": settings.DB_MAX_OVERFLOW
+        },
+        "scenarios": {}
+    }
+
+    async with client:
+        # log everyone in once up front, login itself is its own scenario
+        emails = [owner["email"] for owner in dataset.owners] + [customer["email"] for customer in dataset.customers]
+        tokens = {}
+        for i in range(0, len(emails), 16):
+            batch = emails[i:i + 16]
+            tokens.update(zip(batch, await asyncio.gather(*(login(client, email) for email in batch))))
+
+        scenarios = build_scenarios(client, dataset, tokens)
+
+        for name in args.scenarios:
+            # a short warm up so connection setup and caches don't land in the numbers
+            await run_scenario(scenarios[name], warmup, args.concurrency, args.seed + 1)
+            results["scenarios"][name] = await run_scenario(scenarios[name], args.requests, args.concurrency, args.seed)
+
+    if not args.base_url:
+        from app.core.database import engine
+        await engine.dispose()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"target {target}, commit {results['commit']}, concurrency {args.concurrency}, dataset {dataset.counts}")
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{results['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"saved {output}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tag", default="bench")
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sample", type=int, default=50, help="seeded owners and customers to act as")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Duplicate order submissions with one Idempotency-Key.
+
+Fires ``--duplicates`` concurrent POST /orders/create requests that share an
+Idempotency-Key, the way a mobile client retrying on a flaky network would,
+for ``--keys`` different keys at once. Checks that every key created exactly
+one order, that all duplicates got the same response (one original, the rest
+replayed) and that stock went down once per key. Also checks that reusing a
+key with another cart is refused.
+
+Needs a migrated database in DATABASE_URL:
+
+    python -m benchmarks.idempotency --keys 20 --duplicates 10
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select, func
+
+from app.core.database import engine, async_session_maker
+from app.main import app
+from app.models.item import Item
+from app.models.order import Order
+from benchmarks.stock_contention import percentile, register
+
+
+async def run(keys: int, duplicates: int):
+    engine.echo = False
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        owner = await register(client, "owner", "shop_owner")
+        customer = await register(client, "customer", "normal")
+
+        shop = (await client.post("/shops/create", json={"name": "Idempotency"}, headers=owner)).json()
+        item = (await client.post(f"/items/{shop['id']}/add", json={
+            "name": "Retried item",
+            "price": "4.50",
+            "stock_quantity": keys * duplicates
+        }, headers=owner)).json()
+
+        payload = {"shop_id": shop["id"], "items": [{"item_id": item["id"], "quantity": 1}]}
+        latencies = []
+
+        async def submit(key):
+            start = time.perf_counter()
+            response = await client.post(
+                "/orders/create",
+                json=payload,
+                headers={**customer, "Idempotency-Key": key}
+            )
+            latencies.append(time.perf_counter() - start)
+            return response
+
+        idempotency_keys = [uuid.uuid4().hex for _ in range(keys)]
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            submit(key) for key in idempotency_keys for _ in range(duplicates)
+        ))
+        elapsed = time.perf_counter() - started
+
+        reused = await client.post(
+            "/orders/create",
+            json={**payload, "notes": "another cart"},
+            headers={**customer, "Idempotency-Key": idempotency_keys[0]}
+        )
+
+    async with async_session_maker() as session:
+        orders = (await session.execute(
+            select(func.count(Order.id)).where(Order.shop_id == shop["id"])
+        )).scalar_one()
+        remaining = (await session.execute(
+            select(Item.stock_quantity).where(Item.id == item["id"])
+        )).scalar_one()
+
+    failures = []
+
+    for index, key in enumerate(idempotency_keys):
+        group = responses[index * duplicates:(index + 1) * duplicates]
+
+        if any(response.status_code != 200 for response in group):
+            failures.append(f"{key}: statuses {sorted({r.status_code for r in group})}")
+            continue
+
+        order_ids = {response.json()["id"] for response in group}
+        originals = sum(1 for response in group if "idempotent-replayed" not in response.headers)
+
+        if len(order_ids) != 1 or originals != 1:
+            failures.append(f"{key}: orders {sorted(order_ids)}, {originals} originals")
+
+    print(f"requests          {keys} keys x {duplicates} duplicates = {len(responses)}")
+    print(f"orders created    {orders} (expected {keys})")
+    print(f"stock             {keys * duplicates} -> {remaining} (expected {keys * duplicates - keys})")
+    print(f"key reuse         {reused.status_code} (expected 409)")
+    print(f"throughput        {len(responses) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(
+        "latency ms        "
+        f"p50 {percentile(latencies, 50) * 1000:.1f}  "
+        f"p95 {percentile(latencies, 95) * 1000:.1f}  "
+        f"max {max(latencies) * 1000:.1f}"
+    )
+
+    for failure in failures[:10]:
+        print(f"FAILED            {failure}")
+
+    ok = not failures and orders == keys and remaining == keys * duplicates - keys and reused.status_code == 409
+    print("RESULT            " + ("ok, one order per key" if ok else "DUPLICATES OR ERRORS"))
+
+    await engine.dispose()
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--duplicates", type=int, default=10)
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(run(args.keys, args.duplicates)))
+
+
+if __name__ == "__main__":
+    main()
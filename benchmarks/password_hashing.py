@@ -0,0 +1,91 @@
+"""Event-loop lag while hashing passwords, inline vs. offloaded.
+
+Runs a ticker that wakes up every ``--tick-ms`` and records how late it was,
+while ``--hashes`` concurrent Argon2 hashes run either inline on the event
+loop (the old behaviour) or through the bounded ``password_hasher`` pool.
+Lag is what every other request on the worker waits for.
+
+No database needed:
+
+    python -m benchmarks.password_hashing --hashes 32
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.security import pwd_context, PasswordHasher
+from app.core.config import settings
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(hash_one, hashes: int, tick: float):
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(tick * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(hash_one(f"password-{n}") for n in range(hashes)))
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    await ticker_task
+
+    return elapsed, lags
+
+
+async def run(hashes: int, tick_ms: float, workers: int):
+    tick = tick_ms / 1000
+
+    async def inline(password):
+        # what register/login used to do: a sync hash inside the handler
+        pwd_context.hash(password)
+
+    hasher = PasswordHasher(pwd_context, workers=workers, max_queue=hashes)
+
+    results = {
+        "inline": await measure(inline, hashes, tick),
+        f"offloaded ({workers} workers)": await measure(hasher.hash, hashes, tick)
+    }
+
+    print(
+        f"argon2id t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST}KiB "
+        f"p={settings.ARGON2_PARALLELISM}, {hashes} hashes, tick {tick_ms}ms"
+    )
+    print(f"{'mode':<24}{'hashes/s':>10}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}   (ms)")
+
+    for mode, (elapsed, lags) in results.items():
+        print(
+            f"{mode:<24}{hashes / elapsed:>10.1f}"
+            f"{percentile(lags, 50) * 1000:>10.1f}"
+            f"{percentile(lags, 99) * 1000:>10.1f}"
+            f"{max(lags) * 1000:>10.1f}"
+        )
+
+    print("hasher stats", hasher.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hashes", type=int, default=32)
+    parser.add_argument("--tick-ms", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.hashes, args.tick_ms, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Item search benchmark: full text search vs. a sequential ILIKE scan.
+
+Seeds ``--items`` items with random names, categories and descriptions into
+one throwaway shop (skipped when enough benchmark items already exist), then
+runs the same queries through PostgresSearchBackend (tsvector + GIN) and
+LikeSearchBackend (ILIKE '%term%' on every column) and reports latency and
+the plan Postgres picked.
+
+Needs a migrated database in DATABASE_URL:
+
+    python -m benchmarks.search --items 200000 --runs 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import engine, async_session_maker
+from app.models.enums import UserType
+from app.models.item import Item
+from app.models.shop import Shop
+from app.models.user import User
+from app.utils.search import ITEM_SEARCH, LikeSearchBackend, PostgresSearchBackend, search_terms
+
+
+BENCH_SHOP = "search-benchmark"
+
+WORDS = (
+    "apple banana cherry mango peach plum grape lemon lime melon berry "
+    "bread bagel bun roll toast cake cookie muffin tart pie donut "
+    "coffee tea latte mocha juice soda water smoothie shake "
+    "spicy sweet salty sour fresh frozen organic vegan classic special "
+    "large small family double single mini jumbo crispy soft hot cold"
+).split()
+
+CATEGORIES = ["bakery", "drinks", "fruit", "snacks", "dairy", "frozen", "deli", "sweets"]
+
+QUERIES = ["mango", "coff", "spicy mango", "fresh bread roll", "zzzz"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def random_item(shop_id: int, rng: random.Random) -> dict:
+    return {
+        "shop_id": shop_id,
+        "name": " ".join(rng.sample(WORDS, 3)),
+        "description": " ".join(rng.choices(WORDS, k=12)),
+        "category": rng.choice(CATEGORIES),
+        "price": round(rng.uniform(0.5, 50), 2),
+        "is_available": rng.random() > 0.1,
+        "stock_quantity": rng.randint(0, 100)
+    }
+
+
+async def seed(items: int) -> int:
+    async with async_session_maker() as session:
+        shop_id = (await session.execute(
+            select(Shop.id).where(Shop.name == BENCH_SHOP)
+        )).scalar_one_or_none()
+
+        if shop_id is None:
+            tag = uuid.uuid4().hex[:10]
+            owner_id = (await session.execute(
+                insert(User).values(
+                    email=f"search-bench-{tag}@example.com",
+                    username=f"search-bench-{tag}",
+                    hashed_password="!",
+                    user_type=UserType.SHOP_OWNER
+                ).returning(User.id)
+            )).scalar_one()
+            shop_id = (await session.execute(
+                insert(Shop).values(name=BENCH_SHOP, owner_id=owner_id).returning(Shop.id)
+            )).scalar_one()
+
+        existing = (await session.execute(
+            select(func.count()).select_from(Item).where(Item.shop_id == shop_id)
+        )).scalar_one()
+
+        rng = random.Random(42)
+        missing = items - existing
+
+        for start in range(0, max(0, missing), 5000):
+            rows = [random_item(shop_id, rng) for _ in range(min(5000, missing - start))]
+            await session.execute(insert(Item), rows)
+
+        await session.commit()
+
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE items"))
+        await conn.commit()
+
+    total = max(items, existing)
+    print(f"catalog           {total} items ({max(0, missing)} inserted)")
+    return shop_id
+
+
+async def run_query(backend, q: str, limit: int):
+    condition, rank = backend.match(ITEM_SEARCH, search_terms(q))
+    query = (
+        select(Item.id, rank.label("rank"))
+        .where(condition)
+        .order_by(rank.desc(), Item.id.desc())
+        .limit(limit + 1)
+    )
+
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        rows = (await session.execute(query)).all()
+        elapsed = time.perf_counter() - started
+
+        plan = (await session.execute(
+            text("EXPLAIN " + str(query.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})))
+        )).scalars().all()
+
+    scan = next((line.strip() for line in plan if "Scan" in line), plan[0].strip())
+    return elapsed, len(rows), scan
+
+
+async def run(items: int, runs: int, limit: int):
+    await seed(items)
+
+    backends = {"fts": PostgresSearchBackend(), "ilike": LikeSearchBackend()}
+
+    print(f"{'query':<20}{'backend':<8}{'rows':>6}{'p50 ms':>10}{'p95 ms':>10}   plan")
+
+    for q in QUERIES:
+        for name, backend in backends.items():
+            timings = []
+            for _ in range(runs):
+                elapsed, found, scan = await run_query(backend, q, limit)
+                timings.append(elapsed)
+
+            print(
+                f"{q:<20}{name:<8}{found:>6}"
+                f"{statistics.median(timings) * 1000:>10.2f}"
+                f"{percentile(timings, 95) * 1000:>10.2f}   {scan[:60]}"
+            )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.items, args.runs, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Seed a synthetic dataset for the endpoint benchmarks.
+
+Generates shop owners (one shop each, with ``--items-per-shop`` items),
+customers, and ``--orders`` orders of 1-4 lines spread over the last
+``--days`` days, then rebuilds the sales rollups. Rows are written with COPY
+in chunks of ``--chunk`` orders, so millions of orders take minutes and
+constant memory. The same ``--seed`` gives the same dataset.
+
+Every seeded user has the password ``bench-password`` and an email like
+``<tag>-customer-17@example.com``, which is how benchmarks.endpoints finds
+them. Run it against an idle database, ids are reserved in blocks:
+
+    python -m benchmarks.seed --customers 10000 --owners 200 --orders 1000000
+    python -m benchmarks.seed --tag bench --reset    # drop a seeded dataset
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.database import async_session_maker, engine
+from app.core.security import pwd_context
+from app.utils.sales_rollup import rebuild_all_rollups
+
+
+PASSWORD = "bench-password"
+
+CATEGORIES = ["coffee", "tea", "bakery", "sandwich", "salad", "dessert", "juice", "snack"]
+
+# share of orders per status, older orders are mostly picked up
+STATUSES = [("PICKED", 0.80), ("CANCELLED", 0.08), ("READY", 0.04), ("PENDING", 0.08)]
+
+
+def dsn() -> str:
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def owner_email(tag: str, index: int) -> str:
+    return f"{tag}-owner-{index}@example.com"
+
+
+def customer_email(tag: str, index: int) -> str:
+    return f"{tag}-customer-{index}@example.com"
+
+
+# Reserve n consecutive ids from a table's sequence, returns the first one
+async def reserve_ids(connection, table: str, n: int) -> int:
+    last = await connection.fetchval(
+        "SELECT setval(pg_get_serial_sequence($1, 'id'), nextval(pg_get_serial_sequence($1, 'id')) + $2 - 1)",
+        table,
+        n
+    )
+    return last - n + 1
+
+
+async def copy(connection, table: str, columns: list[str], records: list[tuple]):
+    if records:
+        await connection.copy_records_to_table(table, records=records, columns=columns)
+
+
+async def seed_users(connection, tag: str, prefix: str, count: int, user_type: str, password_hash: str, now) -> list[int]:
+    first = await reserve_ids(connection, "users", count)
+    email = owner_email if user_type == "SHOP_OWNER" else customer_email
+
+    await copy(
+        connection,
+        "users",
+        ["id", "email", "username", "hashed_password", "full_name", "user_type", "is_active", "created_at", "updated_at"],
+        [
+            (first + i, email(tag, i), f"{tag}-{prefix}-{i}", password_hash, f"{prefix.title()} {i}", user_type, True, now, now)
+            for i in range(count)
+        ]
+    )
+
+    return list(range(first, first + count))
+
+
+async def seed_catalog(connection, tag: str, owner_ids: list[int], items_per_shop: int, rng: random.Random, now):
+    first_shop = await reserve_ids(connection, "shops", len(owner_ids))
+    shop_ids = list(range(first_shop, first_shop + len(owner_ids)))
+
+    await copy(
+        connection,
+        "shops",
+        ["id", "owner_id", "name", "description", "address", "is_active", "created_at", "updated_at"],
+        [
+            (shop_id, owner_id, f"{tag} shop {i}", f"Benchmark shop {i}", f"{i} Bench Street", True, now, now)
+            for i, (shop_id, owner_id) in enumerate(zip(shop_ids, owner_ids))
+        ]
+    )
+
+    first_item = await reserve_ids(connection, "items", len(shop_ids) * items_per_shop)
+    records = []
+    catalog = {}
+
+    for s, shop_id in enumerate(shop_ids):
+        catalog[shop_id] = []
+
+        for i in range(items_per_shop):
+            item_id = first_item + s * items_per_shop + i
+            category = rng.choice(CATEGORIES)
+            price = Decimal(rng.randint(100, 2500)) / 100
+
+            records.append((
+                item_id, shop_id, f"{category} {i}", f"SKU-{i}", f"Benchmark {category}", price,
+                True, 1_000_000_000, category, now, now
+            ))
+            catalog[shop_id].append((item_id, price))
+
+    await copy(
+        connection,
+        "items",
+        ["id", "shop_id", "name", "sku", "description", "price", "is_available", "stock_quantity", "category", "created_at", "updated_at"],
+        records
+    )
+
+    return catalog
+
+
+async def seed_orders(connection, customer_ids, catalog, orders: int, days: int, chunk: int, rng: random.Random, now):
+    shop_ids = list(catalog)
+    statuses = [status for status, _ in STATUSES]
+    weights = [weight for _, weight in STATUSES]
+    written = 0
+
+    while written < orders:
+        count = min(chunk, orders - written)
+        first = await reserve_ids(connection, "orders", count)
+
+        order_records = []
+        line_records = []
+
+        for order_id in range(first, first + count):
+            # a few shops get most of the orders, like real traffic
+            shop_id = shop_ids[int(len(shop_ids) * rng.random() ** 2)]
+            created_at = now - timedelta(seconds=rng.random() * days * 86400)
+            status = rng.choices(statuses, weights)[0]
+
+            total = Decimal("0.00")
+            for item_id, price in rng.sample(catalog[shop_id], min(rng.randint(1, 4), len(catalog[shop_id]))):
+                quantity = rng.randint(1, 3)
+                subtotal = price * quantity
+                total += subtotal
+                line_records.append((order_id, item_id, quantity, price, subtotal, created_at))
+
+            order_records.append((
+                order_id, rng.choice(customer_ids), shop_id, total, status, created_at, created_at,
+                created_at if status == "CANCELLED" else None
+            ))
+
+        async with connection.transaction():
+            await copy(
+                connection,
+                "orders",
+                ["id", "user_id", "shop_id", "total_amount", "status", "created_at", "updated_at", "cancelled_at"],
+                order_records
+            )
+            await copy(
+                connection,
+                "order_items",
+                ["order_id", "item_id", "quantity", "unit_price", "subtotal", "created_at"],
+                line_records
+            )
+
+        written += count
+        print(f"  orders {written}/{orders}", flush=True)
+
+
+async def reset(connection, tag: str):
+    # shops, items and orders go with their users (ON DELETE CASCADE)
+    deleted = await connection.execute(
+        "DELETE FROM users WHERE email LIKE $1",
+        f"{tag}-%@example.com"
+    )
+    print(f"reset '{tag}': {deleted}")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    connection = await asyncpg.connect(dsn())
+
+    try:
+        if args.reset:
+            await reset(connection, args.tag)
+            return 0
+
+        if await connection.fetchval("SELECT 1 FROM users WHERE email = $1", owner_email(args.tag, 0)):
+            print(f"dataset '{args.tag}' already exists, pass another --tag or --reset it first")
+            return 1
+
+        started = time.perf_counter()
+        password_hash = pwd_context.hash(PASSWORD)
+
+        async with connection.transaction():
+            owner_ids = await seed_users(connection, args.tag, "owner", args.owners, "SHOP_OWNER", password_hash, now)
+            customer_ids = await seed_users(connection, args.tag, "customer", args.customers, "NORMAL", password_hash, now)
+            catalog = await seed_catalog(connection, args.tag, owner_ids, args.items_per_shop, rng, now)
+
+        print(f"users, shops and items in {time.perf_counter() - started:.1f}s")
+
+        # one transaction per chunk, an interrupted run keeps the chunks it wrote
+        await seed_orders(connection, customer_ids, catalog, args.orders, args.days, args.chunk, rng, now)
+
+        await connection.execute("ANALYZE users, shops, items, orders, order_items")
+        print(f"orders in {time.perf_counter() - started:.1f}s")
+    finally:
+        await connection.close()
+
+    if not args.skip_rollups:
+        await rebuild_all_rollups(async_session_maker)
+        print(f"rollups rebuilt in {time.perf_counter() - started:.1f}s")
+
+    await engine.dispose()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tag", default="bench")
+    parser.add_argument("--owners", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--items-per-shop", type=int, default=50)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-rollups", action="store_true")
+    parser.add_argument("--reset", action="store_true")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Response serialization of a large order page, FastAPI default vs. fast path.
+
+Builds ``--orders`` orders with their user, shop and ``--lines`` lines each
+as ORM objects (no database), the way GET /orders/shop/{shop_id} loads them,
+and times turning the page into a response body:
+
+* ``default``: FastAPI's own pass, validate into the route's response_model,
+  dump the models to a dict, encode it with json.dumps (JSONResponse)
+* ``orjson``: the same pass encoded with ORJSONResponse, the app's default
+  response class
+* ``model_response``: validate once and encode the models with pydantic-core
+  straight to bytes, what the order routes return
+
+Checks that all three bodies are byte for byte the same. No database needed:
+
+    python -m benchmarks.serialization --orders 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse, model_response
+from app.main import app
+from app.models.enums import ItemStatus, UserType
+from app.models.item import Item
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.shop import Shop
+from app.models.user import User
+from app.schemas.common import CursorPage
+from app.schemas.order import OrderDetailResponse
+from app.utils.pagination import build_page
+
+
+def build_orders(count: int, lines: int) -> list[Order]:
+    now = datetime.now(timezone.utc)
+
+    owner = User(
+        id=1, email="owner@example.com", username="owner", full_name="Shop Owner",
+        user_type=UserType.SHOP_OWNER, is_active=True, created_at=now, updated_at=now
+    )
+    shop = Shop(
+        id=1, owner_id=owner.id, name="Serialization Shop", description="Benchmark shop",
+        address="1 Bench Street", is_active=True, created_at=now, updated_at=now
+    )
+    items = [
+        Item(
+            id=i + 1, shop_id=shop.id, name=f"Item {i}", sku=f"SKU-{i}", description="A benchmark item",
+            price=Decimal(f"{i + 1}.50"), is_available=True, category="coffee", stock_quantity=100,
+            created_at=now, updated_at=now
+        )
+        for i in range(lines)
+    ]
+
+    orders = []
+    for n in range(count):
+        created_at = now - timedelta(minutes=n)
+        customer = User(
+            id=100 + n, email=f"customer-{n}@example.com", username=f"customer-{n}", full_name=f"Customer {n}",
+            user_type=UserType.NORMAL, is_active=True, created_at=created_at, updated_at=created_at
+        )
+        order_items = [
+            OrderItem(
+                id=n * lines + i + 1, order_id=n + 1, item_id=item.id, item=item, quantity=2,
+                unit_price=item.price, subtotal=item.price * 2, created_at=created_at
+            )
+            for i, item in enumerate(items)
+        ]
+
+        orders.append(Order(
+            id=n + 1, user_id=customer.id, shop_id=shop.id, user=customer, shop=shop, order_items=order_items,
+            total_amount=sum(line.subtotal for line in order_items), status=ItemStatus.PICKED,
+            delivery_address=None, notes="Leave at the counter", created_at=created_at, updated_at=created_at
+        ))
+
+    return orders
+
+
+def shop_orders_route():
+    return next(
+        route for route in app.routes
+        if getattr(route, "path", None) == "/orders/shop/{shop_id}" and "GET" in route.methods
+    )
+
+
+async def run(orders: int, lines: int, repeat: int):
+    # measure the fast path even where VALIDATE_RESPONSES is on
+    settings.VALIDATE_RESPONSES = False
+
+    page = build_page(build_orders(orders, lines), orders, lambda o: (o.created_at, o.id))
+    field = shop_orders_route().response_field
+
+    async def default():
+        return JSONResponse(await serialize_response(field=field, response_content=page)).body
+
+    async def with_orjson():
+        return ORJSONResponse(await serialize_response(field=field, response_content=page)).body
+
+    async def fast_path():
+        return model_response(CursorPage[OrderDetailResponse], page).body
+
+    paths = {"default": default, "orjson": with_orjson, "model_response": fast_path}
+
+    bodies = {}
+    timings = {}
+
+    for name, render in paths.items():
+        bodies[name] = await render()
+        samples = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await render()
+            samples.append(time.perf_counter() - started)
+
+        timings[name] = statistics.median(samples)
+
+    print(f"payload           {orders} orders x {lines} lines, {len(bodies['default']) / 1024:.0f} KiB")
+
+    for name, seconds in timings.items():
+        print(f"{name:<18}{seconds * 1000:8.1f} ms  {timings['default'] / seconds:5.1f}x")
+
+    same = len(set(bodies.values())) == 1
+    print("RESULT            " + ("ok, identical bodies" if same else "BODIES DIFFER"))
+    return 0 if same else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(run(args.orders, args.lines, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Flash-sale benchmark: many parallel orders against one hot item.
+
+Fires ``--orders`` concurrent POST /orders/create requests for a single item
+with ``--stock`` units through an in-process ASGI client and checks that the
+number of accepted orders never exceeds the stock, that the item ends at
+exactly ``stock - accepted`` and that latencies stay flat (no lock convoy).
+
+Needs a migrated database in DATABASE_URL:
+
+    python -m benchmarks.stock_contention --orders 500 --stock 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+from app.core.database import engine, async_session_maker
+from app.main import app
+from app.models.item import Item
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def register(client, prefix, user_type):
+    tag = uuid.uuid4().hex[:10]
+    email = f"{prefix}-{tag}@example.com"
+
+    await client.post("/auth/register", json={
+        "email": email,
+        "username": f"{prefix}-{tag}",
+        "password": "bench-password",
+        "full_name": prefix,
+        "user_type": user_type
+    })
+    response = await client.post("/auth/login", json={"email": email, "password": "bench-password"})
+
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+async def run(orders: int, stock: int, quantity: int):
+    engine.echo = False
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        owner = await register(client, "owner", "shop_owner")
+        customer = await register(client, "customer", "normal")
+
+        shop = (await client.post("/shops/create", json={"name": "Flash sale"}, headers=owner)).json()
+        item = (await client.post(f"/items/{shop['id']}/add", json={
+            "name": "Hot item",
+            "price": "9.99",
+            "stock_quantity": stock
+        }, headers=owner)).json()
+
+        payload = {"shop_id": shop["id"], "items": [{"item_id": item["id"], "quantity": quantity}]}
+        latencies = []
+
+        async def place_order():
+            start = time.perf_counter()
+            response = await client.post("/orders/create", json=payload, headers=customer)
+            latencies.append(time.perf_counter() - start)
+            return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(place_order() for _ in range(orders)))
+        elapsed = time.perf_counter() - started
+
+    async with async_session_maker() as session:
+        remaining = (await session.execute(
+            select(Item.stock_quantity).where(Item.id == item["id"])
+        )).scalar_one()
+
+    accepted = statuses.count(200)
+    rejected = statuses.count(409)
+    errors = len(statuses) - accepted - rejected
+    sold = accepted * quantity
+
+    print(f"orders fired      {orders}")
+    print(f"accepted / 409    {accepted} / {rejected}   other errors {errors}")
+    print(f"stock             {stock} -> {remaining}   units sold {sold}")
+    print(f"throughput        {orders / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(
+        "latency ms        "
+        f"p50 {percentile(latencies, 50) * 1000:.1f}  "
+        f"p95 {percentile(latencies, 95) * 1000:.1f}  "
+        f"p99 {percentile(latencies, 99) * 1000:.1f}  "
+        f"max {max(latencies) * 1000:.1f}  "
+        f"stdev {statistics.pstdev(latencies) * 1000:.1f}"
+    )
+
+    oversold = sold > stock or remaining != stock - sold or remaining < 0
+    print("RESULT            " + ("OVERSOLD" if oversold else "ok, no oversell"))
+
+    await engine.dispose()
+    return 1 if oversold or errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=200)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(run(args.orders, args.stock, args.quantity)))
+
+
+if __name__ == "__main__":
+    main()
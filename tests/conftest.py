@@ -0,0 +1,113 @@
+import os
+import uuid
+
+# never reach the email provider from tests
+os.environ.setdefault("EMAIL_BACKEND", "fake")
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.database import engine, read_engine
+from app.core.query_debug import assert_max_queries
+from app.main import app
+
+
+PASSWORD = "test-password"
+
+
+# Tests run against the database in DATABASE_URL, migrated to head. Every
+# test registers its own users and shops, so they don't see each other's rows.
+# Give them a database of their own: the email tests hand whatever is
+# pending in the outbox to a fake sender.
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+# In-process client. The app's lifespan is not run, background workers
+# (email dispatcher, events listener) stay off unless a test starts them.
+@pytest.fixture
+async def client():
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except (OSError, SQLAlchemyError) as exc:
+        pytest.skip(f"database not reachable: {exc}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        yield client
+
+    # pooled connections belong to this test's event loop
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+# Statement budget for a block, see assert_max_queries:
+#
+#     async def test_my_orders(client, customer, max_queries):
+#         with max_queries(2, max_repeats=1):
+#             await client.get("/orders/me", headers=customer)
+@pytest.fixture
+def max_queries():
+    return assert_max_queries
+
+
+async def register(client, user_type: str = "normal") -> dict:
+    tag = uuid.uuid4().hex[:12]
+    email = f"{user_type}-{tag}@example.com"
+
+    response = await client.post("/auth/register", json={
+        "email": email,
+        "username": f"{user_type}-{tag}",
+        "password": PASSWORD,
+        "full_name": f"Test {user_type}",
+        "user_type": user_type
+    })
+    assert response.status_code == 200, response.text
+
+    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+@pytest.fixture
+async def owner(client):
+    return await register(client, "shop_owner")
+
+
+@pytest.fixture
+async def customer(client):
+    return await register(client, "normal")
+
+
+# A shop of `owner` with three items in stock: {"id": ..., "items": [...]}
+@pytest.fixture
+async def shop(client, owner):
+    response = await client.post("/shops/create", json={"name": "Test shop"}, headers=owner)
+    assert response.status_code == 200, response.text
+    shop = response.json()
+
+    shop["items"] = []
+    for n in range(3):
+        response = await client.post(f"/items/{shop['id']}/add", json={
+            "name": f"Item {n}",
+            "price": "2.50",
+            "stock_quantity": 1000
+        }, headers=owner)
+        assert response.status_code == 200, response.text
+        shop["items"].append(response.json())
+
+    return shop
+
+
+async def place_order(client, customer: dict, shop: dict, headers: dict | None = None, **fields):
+    return await client.post("/orders/create", json={
+        "shop_id": shop["id"],
+        "items": [{"item_id": item["id"], "quantity": 1} for item in shop["items"][:2]],
+        **fields
+    }, headers={**customer, **(headers or {})})
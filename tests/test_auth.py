@@ -0,0 +1,37 @@
+import pytest
+
+from jose import jwt
+from tests.conftest import place_order
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        calls.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    return calls
+
+
+# the sessions need the caller's id and the auth dependencies the claims,
+# both come from the one decode
+async def test_token_is_decoded_once_per_request(client, customer, shop, decodes):
+    response = await client.get("/orders/me", headers=customer)
+    assert response.status_code == 200
+    assert len(decodes) == 1
+
+    response = await place_order(client, customer, shop)
+    assert response.status_code == 200
+    assert len(decodes) == 2
+
+
+async def test_invalid_token_is_refused(client):
+    response = await client.get("/orders/me", headers={"Authorization": "Bearer not-a-token"})
+
+    assert response.status_code == 401
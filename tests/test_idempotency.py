@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select, func
+
+from app.core.database import async_session_maker
+from app.models.item import Item
+from app.models.order import Order
+from tests.conftest import place_order, register
+
+pytestmark = pytest.mark.anyio
+
+
+async def shop_state(shop) -> tuple[int, int]:
+    async with async_session_maker() as session:
+        orders = (await session.execute(
+            select(func.count(Order.id)).where(Order.shop_id == shop["id"])
+        )).scalar_one()
+        stock = (await session.execute(
+            select(Item.stock_quantity).where(Item.id == shop["items"][0]["id"])
+        )).scalar_one()
+
+    return orders, stock
+
+
+# a client retrying on a flaky network: the same request several times at once
+async def test_parallel_duplicates_create_one_order(client, customer, shop):
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+
+    responses = await asyncio.gather(*(
+        place_order(client, customer, shop, headers=key) for _ in range(10)
+    ))
+
+    assert [response.status_code for response in responses] == [200] * 10
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum("idempotent-replayed" not in response.headers for response in responses) == 1
+    assert all(response.json() == responses[0].json() for response in responses)
+
+    assert await shop_state(shop) == (1, 999)
+
+
+async def test_retry_after_success_is_replayed(client, customer, shop):
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+
+    first = await place_order(client, customer, shop, headers=key)
+    retry = await place_order(client, customer, shop, headers=key)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert await shop_state(shop) == (1, 999)
+
+
+async def test_key_reused_with_other_body_is_refused(client, customer, shop):
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+
+    first = await place_order(client, customer, shop, headers=key)
+    reused = await place_order(client, customer, shop, headers=key, notes="another cart")
+
+    assert first.status_code == 200
+    assert reused.status_code == 409
+    assert await shop_state(shop) == (1, 999)
+
+
+# keys are per user, the same key from someone else is a new request
+async def test_keys_are_scoped_to_the_user(client, customer, shop):
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    other = await register(client)
+
+    first = await place_order(client, customer, shop, headers=key)
+    second = await place_order(client, other, shop, headers=key)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["id"] != second.json()["id"]
+    assert await shop_state(shop) == (2, 998)
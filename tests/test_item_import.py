@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.item import Item
+
+pytestmark = pytest.mark.anyio
+
+
+async def shop_skus(shop) -> list[str]:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Item.sku).where(Item.shop_id == shop["id"], Item.sku.is_not(None)).order_by(Item.sku)
+        )
+        return result.scalars().all()
+
+
+# chunks before the unreadable line are already committed, the client gets
+# a report saying what landed instead of an error
+async def test_long_line_truncates_with_a_report(client, owner, shop, monkeypatch):
+    monkeypatch.setattr(settings, "ITEM_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "ITEM_IMPORT_MAX_LINE_BYTES", 200)
+
+    rows = [json.dumps({"sku": f"SKU-{n}", "name": f"Imported {n}", "price": "1.00"}) for n in range(5)]
+
+    async def upload():
+        yield ("\n".join(rows) + "\n").encode()
+        yield b'{"sku": "SKU-LONG", "name": "' + b"x" * 1000
+        yield b'"}\n{"sku": "SKU-AFTER", "name": "After", "price": "1.00"}\n'
+
+    response = await client.post(
+        f"/items/{shop['id']}/import",
+        content=upload(),
+        headers={**owner, "Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+
+    assert report["truncated"] is True
+    assert (report["received"], report["created"], report["failed"]) == (5, 5, 1)
+    assert report["errors"][0]["row"] == 6
+    assert await shop_skus(shop) == [f"SKU-{n}" for n in range(5)]
+
+
+async def test_complete_upload_is_not_truncated(client, owner, shop):
+    response = await client.post(
+        f"/items/{shop['id']}/import",
+        content="sku,name,price\nSKU-A,A,1.00\nSKU-B,B,2.00\n",
+        headers={**owner, "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "received": 2, "created": 2, "updated": 0, "failed": 0, "errors": [], "truncated": False
+    }
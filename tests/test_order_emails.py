@@ -0,0 +1,70 @@
+import pytest
+
+from app.core.database import async_session_maker
+from app.utils.email_outbox import EmailDispatcher
+from app.utils.email_sender import FakeEmailSender
+from tests.conftest import place_order
+
+pytestmark = pytest.mark.anyio
+
+
+async def place_orders(client, customer, shop, count: int) -> list[int]:
+    order_ids = []
+
+    for _ in range(count):
+        response = await place_order(client, customer, shop)
+        assert response.status_code == 200, response.text
+        order_ids.append(response.json()["id"])
+
+    return order_ids
+
+
+# reservation, insert of the order with its lines, rollup lock, shop rollup,
+# item rollups
+async def test_create_order_statement_count(client, customer, shop, max_queries):
+    # load the user into the auth cache first
+    await client.get("/orders/me", headers=customer)
+
+    with max_queries(5):
+        response = await place_order(client, customer, shop)
+
+    assert response.status_code == 200, response.text
+
+
+# ownership check, UPDATE ... RETURNING, order lines, outbox INSERT
+@pytest.mark.parametrize("orders", [2, 20])
+async def test_bulk_status_statement_count(client, owner, customer, shop, orders, max_queries):
+    order_ids = await place_orders(client, customer, shop, orders)
+    await client.get("/orders/me", headers=owner)
+
+    with max_queries(4, max_repeats=1):
+        response = await client.patch(
+            f"/orders/shop/{shop['id']}/status",
+            json={"order_ids": order_ids, "status": "ready"},
+            headers=owner
+        )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == order_ids
+
+
+async def test_bulk_status_emails_sent_in_one_batch(client, owner, customer, shop):
+    # deliver whatever earlier tests left in the outbox
+    await EmailDispatcher(async_session_maker, FakeEmailSender()).run_once()
+
+    order_ids = await place_orders(client, customer, shop, 20)
+
+    response = await client.patch(
+        f"/orders/shop/{shop['id']}/status",
+        json={"order_ids": order_ids, "status": "ready"},
+        headers=owner
+    )
+    assert response.status_code == 200, response.text
+
+    sender = FakeEmailSender()
+    dispatcher = EmailDispatcher(async_session_maker, sender, workers=1, batch_size=50)
+
+    assert await dispatcher.run_once() == 20
+    assert sender.calls == 1
+    assert len(sender.sent) == 20
+    assert len({message.to_email for message in sender.sent}) == 1
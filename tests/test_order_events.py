@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.auth.dependencies import TokenUser
+from app.core.database import async_session_maker
+from app.models.enums import ItemStatus, UserType
+from app.routers import order_events_router
+from app.routers.order_events_router import stream_order_events
+from app.utils.order_events import (
+    InMemoryOrderEventBroker, RESYNC, order_events, order_event, shop_channel, user_channel
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def created(order_id: int, user_id: int = 1, shop_id: int = 1) -> dict:
+    return order_event("order.created", order_id, user_id, shop_id, ItemStatus.PENDING, datetime.now(timezone.utc))
+
+
+async def drain(subscription) -> list:
+    events = []
+
+    while (event := await subscription.get(timeout=0.01)) is not None:
+        events.append(event)
+
+    return events
+
+
+# the session is only closed, shop_id=None needs no query
+async def open_stream():
+    async with async_session_maker() as db:
+        return await stream_order_events(shop_id=None, db=db, current_user=TokenUser(id=1, user_type=UserType.NORMAL))
+
+
+# a response dropped before its body is sent must not hold a subscriber slot
+async def test_unsent_stream_does_not_subscribe():
+    before = order_events.stats()["subscribers"]
+
+    response = await open_stream()
+    await response.body_iterator.aclose()
+
+    assert order_events.stats()["subscribers"] == before
+
+
+async def test_stream_unsubscribes_when_closed():
+    before = order_events.stats()["subscribers"]
+
+    response = await open_stream()
+    assert await anext(response.body_iterator) == ": connected\n\n"
+    assert order_events.stats()["subscribers"] == before + 1
+
+    await response.body_iterator.aclose()
+    assert order_events.stats()["subscribers"] == before
+
+
+async def test_slow_subscriber_is_cut_off_with_one_resync():
+    broker = InMemoryOrderEventBroker(queue_size=2, max_subscribers=10)
+    slow = broker.subscribe({user_channel(1)})
+
+    await broker.publish([created(1), created(2), created(3)])
+
+    assert slow.closed
+    assert await drain(slow) == [RESYNC]
+    assert broker.stats()["delivered_total"] == 2
+    assert broker.stats()["overflows_total"] == 1
+
+    # closed, later events are no longer queued nor counted
+    await broker.publish([created(4)])
+
+    assert await drain(slow) == []
+    assert broker.stats()["overflows_total"] == 1
+
+
+async def test_overflow_leaves_other_subscribers_alone():
+    broker = InMemoryOrderEventBroker(queue_size=2, max_subscribers=10)
+    slow = broker.subscribe({user_channel(1)})
+    other = broker.subscribe({shop_channel(2)})
+
+    await broker.publish([created(1), created(2), created(3), created(4, user_id=2, shop_id=2)])
+
+    assert await drain(slow) == [RESYNC]
+    assert not other.closed
+    assert [event["order_id"] for event in await drain(other)] == [4]
+
+
+# after a listener reconnect every subscriber refetches, a full one is cut off
+async def test_resync_all_reaches_every_subscriber():
+    broker = InMemoryOrderEventBroker(queue_size=2, max_subscribers=10)
+    idle = broker.subscribe({user_channel(1)})
+    busy = broker.subscribe({user_channel(2)})
+
+    await broker.publish([created(1, user_id=2), created(2, user_id=2)])
+    broker._resync_all()
+
+    assert await drain(idle) == [RESYNC]
+    assert not idle.closed
+    assert await drain(busy) == [RESYNC]
+    assert busy.closed
+
+
+async def test_stream_ends_after_an_overflow(monkeypatch):
+    broker = InMemoryOrderEventBroker(queue_size=1, max_subscribers=10)
+    monkeypatch.setattr(order_events_router, "order_events", broker)
+
+    response = await open_stream()
+    assert await anext(response.body_iterator) == ": connected\n\n"
+
+    await broker.publish([created(1), created(2)])
+
+    assert [chunk async for chunk in response.body_iterator] == ["event: resync\ndata: {\"type\": \"resync\"}\n\n"]
+    assert broker.stats()["subscribers"] == 0
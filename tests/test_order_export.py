@@ -0,0 +1,41 @@
+import csv
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.models.enums import ItemStatus
+from app.utils.order_export import EXPORT_COLUMNS, csv_chunk
+
+
+def export_row(**values) -> tuple:
+    row = dict.fromkeys(EXPORT_COLUMNS)
+    row.update(
+        order_id=1,
+        created_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        status=ItemStatus.PENDING,
+        total_amount=Decimal("-1.50"),
+        **values
+    )
+    return tuple(row.values())
+
+
+def read_cells(chunk: bytes) -> dict:
+    return dict(zip(EXPORT_COLUMNS, next(csv.reader(io.StringIO(chunk.decode())))))
+
+
+@pytest.mark.parametrize("text", ["=HYPERLINK(\"http://x\")", "+1+1", "-2+3", "@SUM(A1)", "\tx", "\rx"])
+def test_csv_quotes_formula_like_text(text):
+    cells = read_cells(csv_chunk([export_row(delivery_address=text, order_notes=text, item_name=text)]))
+
+    assert cells["delivery_address"] == cells["order_notes"] == cells["item_name"] == "'" + text
+
+
+def test_csv_keeps_other_values():
+    cells = read_cells(csv_chunk([export_row(delivery_address="1 Main St", order_notes=None)]))
+
+    assert cells["delivery_address"] == "1 Main St"
+    assert cells["order_notes"] == ""
+    assert cells["total_amount"] == "-1.50"
+    assert cells["created_at"] == "2026-01-02T03:04:05+00:00"
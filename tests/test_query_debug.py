@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.database import async_session_maker
+from app.core.query_debug import statement_shape
+from app.models.item import Item
+from tests.conftest import place_order
+
+pytestmark = pytest.mark.anyio
+
+
+def test_statement_shape_folds_parameters():
+    one = statement_shape("SELECT items.id FROM items\n WHERE items.id IN ($1::INTEGER) AND items.shop_id = 7")
+    many = statement_shape("SELECT items.id FROM items WHERE items.id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER) AND items.shop_id = 12")
+
+    assert one == many == "SELECT items.id FROM items WHERE items.id IN (...) AND items.shop_id = ?"
+
+
+# one SELECT per item instead of one for all of them, the N+1 signature
+async def test_repeated_statement_fails_the_budget(client, shop, max_queries):
+    with pytest.raises(AssertionError, match="statement repeated 3 times, expected at most 1"):
+        with max_queries(10, max_repeats=1):
+            async with async_session_maker() as session:
+                for item in shop["items"]:
+                    await session.execute(select(Item).where(Item.id == item["id"]))
+
+
+async def test_order_history_statements_do_not_grow_with_the_page(client, customer, shop, max_queries):
+    placed = 0
+
+    for orders in (2, 10):
+        for _ in range(orders - placed):
+            await place_order(client, customer, shop)
+        placed = orders
+
+        # the orders with user and shop joined, then the lines with their items
+        with max_queries(2, max_repeats=1) as recorder:
+            response = await client.get("/orders/me", params={"limit": orders}, headers=customer)
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == orders
+        assert all(record.call_site.startswith("app/routers/order_router.py") for record in recorder.statements)
+
+
+async def test_shop_orders_statements_do_not_grow_with_the_page(client, owner, customer, shop, max_queries):
+    placed = 0
+
+    for orders in (2, 10):
+        for _ in range(orders - placed):
+            await place_order(client, customer, shop)
+        placed = orders
+
+        # the ownership check, then the same two statements as the order history
+        with max_queries(3, max_repeats=1) as recorder:
+            response = await client.get(f"/orders/shop/{shop['id']}", params={"limit": orders}, headers=owner)
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == orders
+        assert all(record.call_site.startswith("app/routers/order_router.py") for record in recorder.statements)
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import async_session_maker
+from app.models.sales_rollup import ShopDailySales, ItemDailySales
+from app.utils.sales_rollup import rebuild_rollups
+from tests.conftest import place_order
+
+pytestmark = pytest.mark.anyio
+
+
+async def rollups(shop) -> tuple[list, list]:
+    async with async_session_maker() as session:
+        shop_days = (await session.execute(
+            select(ShopDailySales.day, ShopDailySales.orders_count, ShopDailySales.revenue, ShopDailySales.items_sold)
+            .where(ShopDailySales.shop_id == shop["id"])
+        )).all()
+        item_days = (await session.execute(
+            select(ItemDailySales.item_id, ItemDailySales.orders_count, ItemDailySales.quantity, ItemDailySales.revenue)
+            .where(ItemDailySales.shop_id == shop["id"])
+            .order_by(ItemDailySales.item_id)
+        )).all()
+
+    return shop_days, item_days
+
+
+async def rebuild(shop):
+    async with async_session_maker() as session:
+        await rebuild_rollups(session, shop["id"])
+        await session.commit()
+
+
+# orders placed while the shop is rebuilt are neither lost nor counted twice
+async def test_rebuild_alongside_orders(client, customer, shop):
+    async def orders():
+        for _ in range(10):
+            response = await place_order(client, customer, shop)
+            assert response.status_code == 200, response.text
+
+    async def rebuilds():
+        for _ in range(5):
+            await rebuild(shop)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(orders(), orders(), rebuilds())
+
+    live = await rollups(shop)
+    await rebuild(shop)
+
+    assert live == await rollups(shop)
+    assert live[0][0].orders_count == 20